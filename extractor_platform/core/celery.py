@@ -0,0 +1,18 @@
+# core/celery.py
+# Celery app for JOB_BACKEND='celery': keyword jobs become queue
+# messages that any number of worker processes/hosts consume.
+#
+#   celery -A core worker --pool threads --concurrency 8
+#
+# With the threads pool every task in a worker process shares the one
+# scraper runtime (connection pool, browser, request budget). Point
+# CELERY_BROKER_URL at Redis in production; for a local run without
+# Redis use CELERY_BROKER_URL=memory:// with CELERY_TASK_ALWAYS_EAGER=True.
+import os
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
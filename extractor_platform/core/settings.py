@@ -47,12 +47,75 @@ TEMPLATES = [{
     ]},
 }]
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database: 'sqlite' (single host, default) or 'postgres' (production,
+# several writers). Migrations run unchanged on either; to move existing
+# data run `dumpdata --natural-foreign -o data.json` on SQLite, then
+# `migrate` and `loaddata data.json` with DB_ENGINE=postgres.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgres':
+    # Pooled connections (psycopg_pool) are reused across requests and
+    # job threads; Django requires CONN_MAX_AGE=0 while the pool is on
+    DB_POOL = config('DB_POOL', default=True, cast=bool)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='extractor'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': config('DB_POOL_MIN', default=2, cast=int),
+                    'max_size': config('DB_POOL_MAX', default=20, cast=int),
+                    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    # WAL lets status polls read while keyword jobs write; writers queue
+    # on busy_timeout instead of failing with "database is locked", and
+    # IMMEDIATE transactions take the write lock up front so they never
+    # deadlock upgrading from a read
+    SQLITE_BUSY_TIMEOUT_MS = config('SQLITE_BUSY_TIMEOUT_MS', default=20000, cast=int)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # sqlite3's connect timeout is the connection's busy_timeout
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                ),
+            },
+        }
     }
+
+# Job execution: 'thread' runs keyword jobs inside the web process,
+# 'celery' queues them for workers (see core/celery.py)
+JOB_BACKEND = config('JOB_BACKEND', default='thread')
+
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True            # a crashed worker's job is redelivered
+# Redis redelivers any unacked message after the visibility timeout
+# (1h by default), even while its worker is still running it; keep it
+# above the longest keyword job. run_keyword_task also claims the job
+# before starting, so a redelivered copy of a running job is dropped.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'visibility_timeout': config('CELERY_VISIBILITY_TIMEOUT', default=3600 * 24, cast=int),
 }
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1   # long jobs: don't hoard messages
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
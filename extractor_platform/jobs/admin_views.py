@@ -1,7 +1,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
-from .models import BulkJob, KeywordJob, Place, ProxySetting, Package, ServerPressure
+from .models import BulkJob, KeywordJob, Place, ProxySetting, Package, ServerPressure, with_job_totals
 from django.db.models import Sum, Count
 from django.contrib.auth.models import User
 from accounts.models import UserProfile
@@ -19,6 +19,9 @@ from django.conf import settings
 import random
 import threading
 from django.core.cache import cache
+import structlog
+
+log = structlog.get_logger()
 
 def admin_hub_required(view_func):
     @wraps(view_func)
@@ -138,6 +141,28 @@ def admin_dashboard(request):
     else:
         active_ops = stats['active_ops']
 
+    # Scrape cache health (read-only connection, cached alongside)
+    # A locked or unreadable cache file only blanks this panel
+    cache_stats = cache.get('admin_scrape_cache_stats')
+    if not cache_stats:
+        from scraper.cache_store import read_stats
+        from scraper.pipeline import CACHE_DB, CACHE_MAX_BYTES
+        try:
+            raw = read_stats(CACHE_DB)
+        except Exception as e:
+            log.warning('admin.cache_stats_failed', error=str(e))
+            cache_stats = None
+        else:
+            cache_stats = {
+                'entries': raw['entries'],
+                'mb': round(raw['bytes'] / 1048576, 1),
+                'budget_mb': round(CACHE_MAX_BYTES / 1048576),
+                'hit_ratio': round(raw['hit_ratio'] * 100, 1),
+                'evictions': raw['evictions'],
+                'ages': raw['ages'],
+            }
+            cache.set('admin_scrape_cache_stats', cache_stats, 60)
+
     # Snapshot pressure (Non-cached)
     ServerPressure.objects.create(active_jobs=active_ops)
     
@@ -148,6 +173,7 @@ def admin_dashboard(request):
     
     context = {
         'metrics': stats,
+        'scrape_cache': cache_stats,
         'pressure': {
             'values': json.dumps(pressure_data),
             'labels': json.dumps(pressure_labels),
@@ -244,21 +270,18 @@ def user_management(request):
     
     # Include profile resource fields
     users_list = User.objects.all().select_related('profile', 'profile__package').only(
-        'username', 'date_joined', 'is_active', 'email',
+        'username', 'date_joined', 'is_active', 'is_superuser', 'email',
         'profile__phone', 'profile__is_verified', 'profile__package__name',
         'profile__searches_left', 'profile__leads_scraped'
     ).order_by('-date_joined')
+
+    # Per-user stats ride on the page query itself: one query whatever
+    # the page size
+    users_list = with_job_totals(users_list)
     
     paginator = Paginator(users_list, 20) # 20 users per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    
-    # Inject stats manually for current page to avoid heavy join on all users
-    for user in page_obj:
-        user.total_jobs = BulkJob.objects.filter(user=user).count()
-        # total_extracted from all jobs
-        user.total_extracted = KeywordJob.objects.filter(bulk_job__user=user).aggregate(
-            Sum('total_extracted'))['total_extracted__sum'] or 0
 
     packages = Package.objects.all().order_by('price')
     
@@ -409,9 +432,8 @@ def delete_user(request, user_id):
         with transaction.atomic():
             # 0. Ghost Table Cleanup (FK blockers not defined in Django)
             with connection.cursor() as cursor:
-                # SQLite PRAGMA check for safety
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='jobs_searchedcell'")
-                if cursor.fetchone():
+                # Table existence check, backend-agnostic
+                if 'jobs_searchedcell' in connection.introspection.table_names(cursor):
                     cursor.execute("""
                         DELETE FROM jobs_searchedcell 
                         WHERE keyword_job_id IN (
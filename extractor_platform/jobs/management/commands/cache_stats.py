@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from scraper.cache_store import read_stats
+from scraper.pipeline import CACHE_DB, CACHE_MAX_BYTES, _get_cache
+
+
+class Command(BaseCommand):
+    help = 'Show scrape cache size, hit ratio and entry ages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sweep', action='store_true',
+                            help='Delete expired entries and enforce the byte budget first')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete every cache entry')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            removed = _get_cache().clear()
+            self.stdout.write(self.style.WARNING(f'Cleared {removed} cache rows.'))
+        elif options['sweep']:
+            removed = _get_cache().sweep()
+            self.stdout.write(self.style.SUCCESS(f'Swept {removed} expired rows.'))
+
+        stats = read_stats(CACHE_DB)
+        budget = f'{CACHE_MAX_BYTES / 1048576:.0f} MB' if CACHE_MAX_BYTES else 'unbounded'
+        self.stdout.write(f"Entries:      {stats['entries']} ({stats['expired']} expired)")
+        self.stdout.write(f"Stored:       {stats['bytes'] / 1048576:.1f} MB compressed (budget {budget})")
+        self.stdout.write(f"File on disk: {stats['file_bytes'] / 1048576:.1f} MB")
+        self.stdout.write(
+            f"Hit ratio:    {stats['hit_ratio']:.1%} "
+            f"({stats['hits']} hits / {stats['misses']} misses, {stats['evictions']} evicted)"
+        )
+        self.stdout.write('Ages:         ' + ', '.join(
+            f'{label} {count}' for label, count in stats['ages'].items()
+        ))
+        self.stdout.write(
+            f"Spatial:      {stats['seen_places']} places, {stats['covered_tiles']} covered tiles"
+        )
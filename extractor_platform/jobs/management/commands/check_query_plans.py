@@ -0,0 +1,78 @@
+import re
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from jobs.models import Place
+
+TABLE = Place._meta.db_table
+
+# A plan that reads the whole table, or sorts rows an index should
+# already return in order (SQLite and PostgreSQL EXPLAIN wording)
+FULL_SCAN = re.compile(rf'\bSCAN {TABLE}\b(?! USING)|Seq Scan on {TABLE}\b')
+EXTRA_SORT = re.compile(r'TEMP B-TREE|(^|\s)Sort\s+\(', re.MULTILINE)
+
+
+def _plan_checks():
+    """(label, queryset, index the plan must use — None for any)"""
+    hour_ago = timezone.now() - timedelta(hours=1)
+    checks = [
+        ('live monitor: places in the last hour',
+         Place.objects.filter(scraped_at__gte=hour_ago).only('id'),
+         'place_scraped_at_idx'),
+        ('keyword results / CSV export',
+         Place.objects.filter(keyword_job_id=1),
+         None),
+        ('admin keyword places, by name',
+         Place.objects.filter(keyword_job_id=1).order_by('name'),
+         'place_job_name_idx'),
+    ]
+    for field in ('category', 'city', 'state'):
+        index = f'place_{field}_idx'
+        checks += [
+            (f'admin {field} filter',
+             Place.objects.filter(**{field: 'x'}),
+             index),
+            (f'admin {field} filter choices',
+             Place.objects.values_list(field, flat=True).distinct().order_by(field),
+             index),
+        ]
+    return checks
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the hot Place queries and fail if any plans as a full '
+        'table scan or misses its index. Run after migrate, e.g. in CI.'
+    )
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small tables make seq scans look cheap; ask whether an
+                # index path exists at all
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, qs, index in _plan_checks():
+                plan = qs.explain()
+                problems = []
+                if FULL_SCAN.search(plan):
+                    problems.append('full table scan')
+                if EXTRA_SORT.search(plan):
+                    problems.append('sorts outside an index')
+                if index and index not in plan:
+                    problems.append(f'does not use {index}')
+
+                if problems:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f'✗ {label}: {", ".join(problems)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'✓ {label}'))
+                if problems or options['verbosity'] > 1:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'    {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} query plan(s) regressed: {", ".join(failures)}')
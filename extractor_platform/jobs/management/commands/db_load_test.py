@@ -0,0 +1,136 @@
+import statistics
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from jobs.models import BulkJob, KeywordJob, Place
+from scraper.db_writer import ENRICH_FIELDS, WRITE_BATCH
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent job-write and status-poll throughput on the '
+        'configured database. Writes throwaway jobs and deletes them after.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=3,
+                            help='Concurrent writer threads, one keyword job each')
+        parser.add_argument('--pollers', type=int, default=5,
+                            help='Concurrent status-poll threads')
+        parser.add_argument('--seconds', type=float, default=15)
+        parser.add_argument('--batch', type=int, default=WRITE_BATCH,
+                            help='Places per upsert')
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES['default']
+        self.stdout.write(f"Backend: {db['ENGINE']}")
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                mode = cursor.fetchone()[0]
+                cursor.execute('PRAGMA busy_timeout')
+                busy = cursor.fetchone()[0]
+            self.stdout.write(f'SQLite journal_mode={mode}, busy_timeout={busy}ms')
+
+        user = User.objects.create(username=f'loadtest-{uuid.uuid4().hex[:8]}')
+        # Stops the threads early if the run is cut short
+        stop = threading.Event()
+        threads = []
+        try:
+            bulk = BulkJob.objects.create(user=user, location='Load test', status='running')
+            jobs = [
+                KeywordJob.objects.create(bulk_job=bulk, keyword=f'load {i}', status='searching')
+                for i in range(options['jobs'])
+            ]
+
+            deadline = time.monotonic() + options['seconds']
+            results = {'write': [], 'poll': [], 'errors': []}
+            lock = threading.Lock()
+
+            def record(kind, started):
+                with lock:
+                    results[kind].append(time.monotonic() - started)
+
+            def writer(kj):
+                n = 0
+                try:
+                    while time.monotonic() < deadline and not stop.is_set():
+                        started = time.monotonic()
+                        rows = [
+                            Place(keyword_job=kj, place_id=f'ChIJload{kj.id}-{n + i}',
+                                  name=f'Place {n + i}', phone='555-0100')
+                            for i in range(options['batch'])
+                        ]
+                        Place.objects.bulk_create(
+                            rows, update_conflicts=True,
+                            unique_fields=['keyword_job', 'place_id'],
+                            update_fields=ENRICH_FIELDS,
+                        )
+                        n += len(rows)
+                        kj.total_extracted = n
+                        kj.cells_done += 1
+                        kj.status_message = f'{n} found'
+                        kj.save(update_fields=['cells_done', 'total_extracted', 'status_message'])
+                        record('write', started)
+                except Exception as e:
+                    with lock:
+                        results['errors'].append(str(e)[:80])
+                finally:
+                    connections.close_all()
+
+            def poller():
+                try:
+                    while time.monotonic() < deadline and not stop.is_set():
+                        started = time.monotonic()
+                        # What the status view reads on every poll
+                        list(KeywordJob.objects.filter(bulk_job=bulk).values(
+                            'id', 'status', 'status_message', 'cells_done',
+                            'total_cells', 'total_extracted',
+                        ))
+                        record('poll', started)
+                        time.sleep(0.05)
+                except Exception as e:
+                    with lock:
+                        results['errors'].append(str(e)[:80])
+                finally:
+                    connections.close_all()
+
+            threads = [threading.Thread(target=writer, args=(kj,)) for kj in jobs]
+            threads += [threading.Thread(target=poller) for _ in range(options['pollers'])]
+            t0 = time.monotonic()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.monotonic() - t0
+
+            rows = Place.objects.filter(keyword_job__bulk_job=bulk).count()
+        finally:
+            # Errors and Ctrl-C must not leave synthetic jobs behind
+            stop.set()
+            for t in threads:
+                if t.is_alive():
+                    t.join()
+            user.delete()
+
+        for kind, label in (('write', 'Job writes'), ('poll', 'Status polls')):
+            lat = sorted(results[kind])
+            if not lat:
+                self.stdout.write(f'{label}: none completed')
+                continue
+            p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+            self.stdout.write(
+                f'{label}: {len(lat) / elapsed:.1f}/s '
+                f'(median {statistics.median(lat) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms)'
+            )
+        self.stdout.write(f'Places written: {rows} ({rows / elapsed:.0f} rows/s)')
+        if results['errors']:
+            self.stdout.write(self.style.ERROR(
+                f"{len(results['errors'])} errors, first: {results['errors'][0]}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('No lock errors.'))
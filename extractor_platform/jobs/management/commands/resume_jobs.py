@@ -0,0 +1,64 @@
+import concurrent.futures
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.models import BulkJob, KeywordJob
+from jobs.tasks import submit_keyword_job, run_keyword_task, finalize_bulk_job
+
+# Statuses a keyword job only holds while a worker is running it
+INTERRUPTED = ('fetching_boundary', 'building_grid', 'searching')
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-queue keyword jobs left mid-run by a restart or crash. '
+        'Finished searches are skipped via their checkpoints. '
+        'Run it while no worker is processing jobs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true',
+                            help='Also resume jobs that ended in failed')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the jobs without queueing them')
+
+    def handle(self, *args, **options):
+        statuses = INTERRUPTED + (('failed',) if options['failed'] else ())
+        jobs = list(
+            KeywordJob.objects.filter(status__in=statuses)
+            .select_related('bulk_job').order_by('id')
+        )
+        if not jobs:
+            self.stdout.write('No interrupted keyword jobs.')
+            return
+
+        for kj in jobs:
+            self.stdout.write(
+                f"  #{kj.id} '{kj.keyword}' in {kj.bulk_job.location} — "
+                f"{kj.status}, {kj.checkpoints.count()} searches done, "
+                f"{kj.places.count()} places"
+            )
+        if options['dry_run']:
+            return
+
+        KeywordJob.objects.filter(id__in=[kj.id for kj in jobs]).update(
+            status='pending', status_message='Queued to resume', error_message=''
+        )
+        BulkJob.objects.filter(
+            id__in={kj.bulk_job_id for kj in jobs}
+        ).update(status='running', **BulkJob.totals_expressions())
+
+        if settings.JOB_BACKEND == 'celery':
+            for kj in jobs:
+                run_keyword_task.delay(kj.id)
+            self.stdout.write(self.style.SUCCESS(f'Enqueued {len(jobs)} jobs.'))
+            return
+
+        # In-process jobs live on this process's runtime; stay until done
+        futures = {submit_keyword_job(kj.id): kj for kj in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            kj = futures[future]
+            kj.refresh_from_db()
+            self.stdout.write(f"  #{kj.id} '{kj.keyword}' — {kj.status}")
+        for bulk_job_id in {kj.bulk_job_id for kj in jobs}:
+            finalize_bulk_job(bulk_job_id)
+        self.stdout.write(self.style.SUCCESS(f'Resumed {len(jobs)} jobs.'))
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_package_features_alter_package_grid_strategies_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CellCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit_key', models.CharField(max_length=64)),
+                ('found', models.IntegerField(default=0)),
+                ('done_at', models.DateTimeField(auto_now_add=True)),
+                ('keyword_job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='jobs.keywordjob')),
+            ],
+            options={
+                'unique_together': {('keyword_job', 'unit_key')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_cellcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['scraped_at'], name='place_scraped_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['keyword_job', 'name'], name='place_job_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['category'], name='place_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['city'], name='place_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['state'], name='place_state_idx'),
+        ),
+    ]
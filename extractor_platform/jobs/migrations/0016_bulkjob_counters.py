@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-17 13:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    BulkJob = apps.get_model('jobs', 'BulkJob')
+    KeywordJob = apps.get_model('jobs', 'KeywordJob')
+
+    def per_bulk_job(qs, aggregate):
+        return Coalesce(Subquery(
+            qs.filter(bulk_job=OuterRef('pk')).order_by()
+            .values('bulk_job').annotate(n=aggregate).values('n')
+        ), 0)
+
+    BulkJob.objects.update(
+        extracted_total=per_bulk_job(KeywordJob.objects.all(), Sum('total_extracted')),
+        keyword_count=per_bulk_job(KeywordJob.objects.all(), Count('id')),
+        keywords_finished=per_bulk_job(
+            KeywordJob.objects.filter(status__in=('completed', 'failed')), Count('id')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_place_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkjob',
+            name='extracted_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bulkjob',
+            name='keyword_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bulkjob',
+            name='keywords_finished',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-17 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_bulkjob_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='place',
+            name='keyword_job',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='places', to='jobs.keywordjob'),
+        ),
+    ]
@@ -1,7 +1,57 @@
 # jobs/models.py
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 
+FINISHED_STATUSES = ('completed', 'failed')
+
+
+def _per_bulk_job(qs, aggregate):
+    """Correlated subquery: `aggregate` over qs rows of the outer BulkJob."""
+    return Coalesce(Subquery(
+        qs.filter(bulk_job=OuterRef('pk')).order_by()
+        .values('bulk_job').annotate(n=aggregate).values('n')
+    ), 0)
+
+
+def with_job_totals(users):
+    """
+    Annotate a User queryset with total_jobs / total_extracted from the
+    stored BulkJob counters, as subqueries on the same SELECT.
+    """
+    user_jobs = BulkJob.objects.filter(user=OuterRef('pk')).order_by().values('user')
+    return users.annotate(
+        total_jobs=Coalesce(Subquery(
+            user_jobs.annotate(n=Count('id')).values('n')
+        ), 0),
+        total_extracted=Coalesce(Subquery(
+            user_jobs.annotate(n=Sum('extracted_total')).values('n')
+        ), 0),
+    )
+
+
+class BulkJobQuerySet(models.QuerySet):
+
+    def with_live_totals(self):
+        """
+        Annotate totals computed from the keyword jobs in the same
+        SELECT; total_extracted / all_complete prefer these over the
+        stored counters.
+        """
+        return self.annotate(
+            live_extracted=Coalesce(Sum('keyword_jobs__total_extracted'), 0),
+            live_keywords=Count('keyword_jobs'),
+            live_finished=Count(
+                'keyword_jobs',
+                filter=Q(keyword_jobs__status__in=FINISHED_STATUSES),
+            ),
+        )
+
+    def refresh_totals(self) -> int:
+        """Recompute the stored counters in one UPDATE."""
+        return self.update(**BulkJob.totals_expressions())
+
 
 class BulkJob(models.Model):
     """
@@ -46,19 +96,43 @@ class BulkJob(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    # Denormalized from the keyword jobs; refreshed whenever one is
+    # saved or deleted (see refresh_bulk_job_totals). Queryset .update()
+    # calls on KeywordJob skip signals and must refresh_totals() themselves
+    extracted_total = models.IntegerField(default=0)
+    keyword_count = models.IntegerField(default=0)
+    keywords_finished = models.IntegerField(default=0)
+
+    objects = BulkJobQuerySet.as_manager()
+
     def __str__(self):
         return f"BulkJob({self.id}) in {self.location} — {self.status}"
 
+    @staticmethod
+    def totals_expressions() -> dict:
+        """Counter column → expression recomputing it, for .update()."""
+        return {
+            'extracted_total': _per_bulk_job(
+                KeywordJob.objects.all(), Sum('total_extracted')
+            ),
+            'keyword_count': _per_bulk_job(
+                KeywordJob.objects.all(), Count('id')
+            ),
+            'keywords_finished': _per_bulk_job(
+                KeywordJob.objects.filter(status__in=FINISHED_STATUSES),
+                Count('id'),
+            ),
+        }
+
     @property
     def total_extracted(self):
-        return sum(j.total_extracted for j in self.keyword_jobs.all())
+        return getattr(self, 'live_extracted', self.extracted_total)
 
     @property
     def all_complete(self):
-        jobs = self.keyword_jobs.all()
-        return jobs.exists() and all(
-            j.status in ('completed', 'failed') for j in jobs
-        )
+        total = getattr(self, 'live_keywords', self.keyword_count)
+        finished = getattr(self, 'live_finished', self.keywords_finished)
+        return total > 0 and finished >= total
 
 
 class KeywordJob(models.Model):
@@ -104,8 +178,10 @@ class KeywordJob(models.Model):
 
 class Place(models.Model):
     """One extracted business. Belongs to a KeywordJob."""
+    # Indexed through place_job_name_idx, which leads with keyword_job
     keyword_job = models.ForeignKey(
-        KeywordJob, on_delete=models.CASCADE, related_name='places'
+        KeywordJob, on_delete=models.CASCADE, related_name='places',
+        db_index=False,
     )
 
     place_id = models.CharField(max_length=500, blank=True)
@@ -125,11 +201,45 @@ class Place(models.Model):
 
     class Meta:
         unique_together = ['keyword_job', 'place_id']
+        # Hot read paths; `manage.py check_query_plans` verifies each
+        # one still plans as an index search
+        indexes = [
+            # Live monitor "results in the last hour", admin date filter
+            models.Index(fields=['scraped_at'], name='place_scraped_at_idx'),
+            # Per-keyword results, CSV export and the name-ordered admin list
+            models.Index(fields=['keyword_job', 'name'], name='place_job_name_idx'),
+            # PlaceAdmin list_filter choices and filtering
+            models.Index(fields=['category'], name='place_category_idx'),
+            models.Index(fields=['city'], name='place_city_idx'),
+            models.Index(fields=['state'], name='place_state_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class CellCheckpoint(models.Model):
+    """
+    One finished (cell, zoom) search of a KeywordJob. Written in batches
+    while the job runs so an interrupted job can resume without
+    repeating the searches it already made.
+    """
+    keyword_job = models.ForeignKey(
+        KeywordJob, on_delete=models.CASCADE, related_name='checkpoints'
+    )
+    unit_key = models.CharField(max_length=64)   # "lat,lng,zoom"
+    # Results the search returned; replayed on resume to rebuild
+    # deeper-zoom and quadtree follow-ups without searching again
+    found = models.IntegerField(default=0)
+    done_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['keyword_job', 'unit_key']
+
+    def __str__(self):
+        return f"Checkpoint({self.keyword_job_id}) {self.unit_key}"
+
+
 class Proxy(models.Model):
     """Proxy storage for management via Admin Panel."""
     PROTOCOL_CHOICES = [
@@ -215,7 +325,7 @@ class ServerPressure(models.Model):
     def __str__(self):
         return f"Pressure @ {self.timestamp}: {self.active_jobs} jobs"
 
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.db import connection
 
@@ -228,12 +338,27 @@ def clear_searched_cells(sender, instance, **kwargs):
     """
     try:
         with connection.cursor() as cursor:
-            # Safely check for table existence (SQLite syntax)
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='jobs_searchedcell'")
-            if cursor.fetchone():
+            # Safely check for table existence (works on any backend)
+            if 'jobs_searchedcell' in connection.introspection.table_names(cursor):
                 cursor.execute("DELETE FROM jobs_searchedcell WHERE keyword_job_id = %s", [instance.id])
     except Exception as e:
         # We don't want to block deletion if the cleanup fails for minor reasons,
         # but the FK check will block it anyway if we don't succeed.
         # Log to terminal for oversight.
         print(f"DEBUG: Failed to clear searched cells for KJ {instance.id}: {e}")
+
+
+# KeywordJob columns the BulkJob counters are computed from
+TOTALS_FIELDS = {'bulk_job', 'status', 'total_extracted'}
+
+@receiver(post_save, sender=KeywordJob)
+@receiver(post_delete, sender=KeywordJob)
+def refresh_bulk_job_totals(sender, instance, update_fields=None, **kwargs):
+    """
+    Keeps BulkJob.extracted_total / keyword_count / keywords_finished in
+    step with every KeywordJob write — pipeline progress, admin edits,
+    deletes — in one UPDATE.
+    """
+    if update_fields is not None and not TOTALS_FIELDS & set(update_fields):
+        return
+    BulkJob.objects.filter(id=instance.bulk_job_id).refresh_totals()
@@ -1,13 +1,19 @@
 import concurrent.futures
 import asyncio
 import structlog
+from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 from .models import BulkJob, KeywordJob
 
 log = structlog.get_logger()
 
-# 🛡️ DYNAMIC QUEUE (Allows multiple keyword jobs to run in parallel)
-# Max 3 concurrent keywords with 4 sub-cells each for maximum stability
+# 🛡️ SHARED RUNTIME: every keyword job in this process runs on one event
+# loop with one connection pool, one browser and one request budget
+# (scraper/runtime.py). Set False to fall back to a loop per keyword.
+SHARED_RUNTIME = True
+
+# Thread-per-keyword fallback: max 3 concurrent keywords
 MAX_CONCURRENT_KEYWORDS = 3
 executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_KEYWORDS)
 
@@ -25,6 +31,65 @@ def run_keyword_job(keyword_job_id: int):
     finally:
         loop.close()
 
+def submit_keyword_job(keyword_job_id: int) -> concurrent.futures.Future:
+    """Queue one keyword job; returns a future that resolves when it ends."""
+    if not SHARED_RUNTIME:
+        return executor.submit(run_keyword_job, keyword_job_id)
+
+    from scraper.pipeline import run_keyword_pipeline
+    from scraper.runtime import get_runtime
+
+    future = get_runtime().submit(run_keyword_pipeline, keyword_job_id)
+
+    def _log_failure(f):
+        if not f.cancelled() and f.exception() is not None:
+            log.error("runtime.job_failed",
+                      keyword_job_id=keyword_job_id, error=str(f.exception()))
+    future.add_done_callback(_log_failure)
+    return future
+
+def finalize_bulk_job(bulk_job_id: int) -> bool:
+    """
+    Mark the bulk job completed once none of its keywords is still
+    active. Safe to call from every worker: only the first caller to
+    see it running flips it.
+    """
+    active = KeywordJob.objects.filter(bulk_job_id=bulk_job_id).exclude(
+        status__in=('completed', 'failed')
+    ).exists()
+    if active:
+        return False
+    done = BulkJob.objects.filter(id=bulk_job_id, status='running').update(
+        status='completed',
+        status_message='Batch finished. Results analyzed.',
+        completed_at=timezone.now(),
+    )
+    if done:
+        log.info("bulk.completed", bulk_job_id=bulk_job_id)
+    return bool(done)
+
+@shared_task(name='jobs.run_keyword')
+def run_keyword_task(keyword_job_id: int):
+    """Queue-consumed keyword job (JOB_BACKEND='celery')."""
+    # Claim the job so a redelivered message can't start it a second
+    # time; a crashed worker's job is picked up by resume_jobs instead
+    claimed = KeywordJob.objects.filter(id=keyword_job_id, status='pending').update(
+        status='fetching_boundary', status_message='Picked up by a worker'
+    )
+    if not claimed:
+        log.warning("worker.job_not_pending", keyword_job_id=keyword_job_id)
+        return
+    try:
+        submit_keyword_job(keyword_job_id).result()
+    except Exception as e:
+        # The pipeline has already marked the KeywordJob failed
+        log.error("worker.job_failed", keyword_job_id=keyword_job_id, error=str(e))
+    bulk_job_id = KeywordJob.objects.filter(
+        id=keyword_job_id
+    ).values_list('bulk_job_id', flat=True).first()
+    if bulk_job_id:
+        finalize_bulk_job(bulk_job_id)
+
 def start_bulk_job(bulk_job_id: int):
     """
     Triggers concurrent execution of keyword segments.
@@ -33,22 +98,30 @@ def start_bulk_job(bulk_job_id: int):
         bulk_job = BulkJob.objects.prefetch_related('keyword_jobs').get(id=bulk_job_id)
         bulk_job.status = 'running'
         bulk_job.status_message = f'Analyzing {bulk_job.keyword_jobs.count()} keywords in parallel queue...'
-        bulk_job.save()
+        bulk_job.save(update_fields=['status', 'status_message'])
+
+        if settings.JOB_BACKEND == 'celery':
+            # Workers finalize the bulk job as its last keyword finishes
+            for kj in bulk_job.keyword_jobs.all():
+                run_keyword_task.delay(kj.id)
+                log.info("job.enqueued", keyword=kj.keyword)
+            return
 
         futures = []
         for kj in bulk_job.keyword_jobs.all():
-            future = executor.submit(run_keyword_job, kj.id)
+            future = submit_keyword_job(kj.id)
             futures.append(future)
-            log.info("thread.queued", keyword=kj.keyword)
+            log.info("job.queued", keyword=kj.keyword, shared=SHARED_RUNTIME)
 
         # Monitor and finalize in a separate control thread
         def monitor_batch():
             concurrent.futures.wait(futures)
-            bulk_job.refresh_from_db()
+            # Only the status columns: the counters are kept current by
+            # the KeywordJob signals and must not be written back stale
             bulk_job.status = 'completed'
             bulk_job.status_message = f'Batch finished. Results analyzed.'
             bulk_job.completed_at = timezone.now()
-            bulk_job.save()
+            bulk_job.save(update_fields=['status', 'status_message', 'completed_at'])
             log.info("bulk.completed", bulk_job_id=bulk_job_id)
 
         import threading
@@ -0,0 +1,189 @@
+# jobs/tests.py
+import concurrent.futures
+import io
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .models import BulkJob, KeywordJob, with_job_totals
+from .tasks import run_keyword_task
+from .views import BulkJobListView
+
+
+def _done_future(result=None) -> concurrent.futures.Future:
+    future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+
+def _bulk_job(keywords=('pizza',), **kwargs) -> BulkJob:
+    user = User.objects.create(username=f'user{User.objects.count()}')
+    bulk = BulkJob.objects.create(user=user, location='Austin, TX', **kwargs)
+    for keyword in keywords:
+        KeywordJob.objects.create(bulk_job=bulk, keyword=keyword)
+    return bulk
+
+
+# ── WORKER TASK ────────────────────────────────────────────────────
+class RunKeywordTaskTests(TestCase):
+
+    def setUp(self):
+        self.bulk = _bulk_job(status='running')
+        self.kj = self.bulk.keyword_jobs.get()
+
+    @mock.patch('jobs.tasks.submit_keyword_job', return_value=_done_future())
+    def test_pending_job_is_claimed_and_run(self, submit):
+        run_keyword_task(self.kj.id)
+        submit.assert_called_once_with(self.kj.id)
+        self.kj.refresh_from_db()
+        self.assertEqual(self.kj.status, 'fetching_boundary')
+
+    @mock.patch('jobs.tasks.submit_keyword_job', return_value=_done_future())
+    def test_redelivered_running_job_is_dropped(self, submit):
+        KeywordJob.objects.filter(id=self.kj.id).update(status='searching')
+        run_keyword_task(self.kj.id)
+        submit.assert_not_called()
+        self.kj.refresh_from_db()
+        self.assertEqual(self.kj.status, 'searching')
+
+    @mock.patch('jobs.tasks.submit_keyword_job', return_value=_done_future())
+    def test_redelivered_finished_job_is_dropped(self, submit):
+        KeywordJob.objects.filter(id=self.kj.id).update(status='completed')
+        run_keyword_task(self.kj.id)
+        submit.assert_not_called()
+
+
+# ── QUERY PLANS ────────────────────────────────────────────────────
+class QueryPlanTests(TestCase):
+
+    def test_hot_place_queries_use_their_indexes(self):
+        # Raises CommandError naming any query that plans as a full scan
+        call_command('check_query_plans', stdout=io.StringIO())
+
+    def test_keyword_job_fk_has_no_separate_index(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, 'jobs_place'
+            )
+        single = [
+            name for name, c in constraints.items()
+            if c['index'] and c['columns'] == ['keyword_job_id']
+        ]
+        self.assertEqual(single, [])
+
+
+# ── BULK JOB COUNTERS ──────────────────────────────────────────────
+class BulkJobTotalsTests(TestCase):
+
+    def setUp(self):
+        self.bulk = _bulk_job(keywords=('pizza', 'tacos'), status='running')
+        self.pizza, self.tacos = self.bulk.keyword_jobs.order_by('id')
+
+    def _counters(self):
+        self.bulk.refresh_from_db()
+        return (self.bulk.total_extracted, self.bulk.keyword_count,
+                self.bulk.keywords_finished, self.bulk.all_complete)
+
+    def test_created_keyword_jobs_are_counted(self):
+        self.assertEqual(self._counters(), (0, 2, 0, False))
+
+    def test_keyword_job_save_refreshes_counters(self):
+        # e.g. an admin edit, outside the pipeline
+        self.pizza.total_extracted = 40
+        self.pizza.status = 'completed'
+        self.pizza.save()
+        self.tacos.total_extracted = 2
+        self.tacos.save(update_fields=['total_extracted'])
+        self.assertEqual(self._counters(), (42, 2, 1, False))
+
+        self.tacos.status = 'failed'
+        self.tacos.save(update_fields=['status'])
+        self.assertEqual(self._counters(), (42, 2, 2, True))
+
+    def test_message_only_save_skips_the_refresh(self):
+        self.pizza.status_message = 'Searching...'
+        with self.assertNumQueries(1):
+            self.pizza.save(update_fields=['status_message'])
+
+    def test_keyword_job_delete_refreshes_counters(self):
+        self.pizza.total_extracted = 40
+        self.pizza.save()
+        self.tacos.status = 'completed'
+        self.tacos.save()
+        self.pizza.delete()
+        self.assertEqual(self._counters(), (0, 1, 1, True))
+
+    def test_live_totals_match_counters(self):
+        self.pizza.total_extracted = 7
+        self.pizza.status = 'completed'
+        self.pizza.save()
+        live = BulkJob.objects.with_live_totals().get(id=self.bulk.id)
+        self.bulk.refresh_from_db()
+        self.assertEqual(
+            (live.total_extracted, live.all_complete),
+            (self.bulk.total_extracted, self.bulk.all_complete),
+        )
+
+
+class BulkJobListQueryTests(TestCase):
+    """The job list costs the same queries however many jobs it shows."""
+
+    def _get(self, user):
+        request = APIRequestFactory().get('/api/jobs/')
+        force_authenticate(request, user=user)
+        return BulkJobListView.as_view()(request)
+
+    def test_constant_query_count(self):
+        bulk = _bulk_job(keywords=('pizza', 'tacos'))
+        user = bulk.user
+        with self.assertNumQueries(2):
+            response = self._get(user)
+        self.assertEqual(len(response.data), 1)
+
+        for n in range(5):
+            other = BulkJob.objects.create(user=user, location=f'City {n}')
+            for keyword in ('a', 'b', 'c'):
+                KeywordJob.objects.create(
+                    bulk_job=other, keyword=keyword, total_extracted=n
+                )
+        with self.assertNumQueries(2):
+            response = self._get(user)
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(
+            sorted(j['total_extracted'] for j in response.data),
+            [0, 0, 3, 6, 9, 12],
+        )
+
+
+class UserJobTotalsTests(TestCase):
+    """The admin user list reads per-user totals in its page query."""
+
+    def _totals(self) -> dict:
+        return {
+            u.username: (u.total_jobs, u.total_extracted)
+            for u in with_job_totals(User.objects.all())
+        }
+
+    def test_constant_query_count(self):
+        kj = _bulk_job().keyword_jobs.get()
+        kj.total_extracted = 5
+        kj.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self._totals(), {'user0': (1, 5)})
+
+        for _ in range(6):
+            bulk = _bulk_job(keywords=('a', 'b'))
+            for kj in bulk.keyword_jobs.all():
+                kj.total_extracted = 3
+                kj.save()
+        User.objects.create(username='idle')
+        with self.assertNumQueries(1):
+            totals = self._totals()
+        self.assertEqual(len(totals), 8)
+        self.assertEqual(totals['user0'], (1, 5))
+        self.assertEqual(totals['user1'], (1, 6))
+        self.assertEqual(totals['idle'], (0, 0))
@@ -180,7 +180,8 @@ class BulkJobStatusView(APIView):
 
     def get(self, request, bulk_job_id):
         try:
-            bulk_job = BulkJob.objects.prefetch_related(
+            # Live totals: this view is the one place exact counts matter
+            bulk_job = BulkJob.objects.with_live_totals().prefetch_related(
                 'keyword_jobs'
             ).get(id=bulk_job_id, user=request.user)
         except BulkJob.DoesNotExist:
@@ -0,0 +1,728 @@
+# scraper/cache_store.py
+# ─────────────────────────────────────────────────────────────────
+# Single-file scrape cache.
+#
+# One SQLite database (WAL mode) instead of one JSON file per
+# (lat, lng, zoom, keyword). Keys are the primary key, expiry has its
+# own index, writes are buffered and committed in batches, a whole
+# job's keys can be prefetched in one query, and a daemon thread
+# sweeps expired rows so nothing waits for a re-read to be deleted.
+# Values are zlib-compressed and the table is held to a byte budget by
+# evicting least-recently-read rows.
+#
+# A byte-bounded in-memory LRU (MemoryLRU) sits in front of the file so
+# hot cities re-run during the day never touch disk.
+#
+# The same file also holds a spatial index: places seen per keyword,
+# binned by map tile, plus which tiles each zoom level has already
+# searched. A new cell whose whole viewport is covered is answered from
+# it, whatever grid produced the earlier searches.
+# ─────────────────────────────────────────────────────────────────
+import os
+import json
+import zlib
+import sqlite3
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import structlog
+
+from .tiles import tiles_in, tile_key, contains
+
+log = structlog.get_logger()
+
+# Bump when a table changes shape; older files are rebuilt (it's a cache)
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    value       BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS entries_access ON entries (last_access);
+
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS seen_places (
+    keyword    TEXT NOT NULL,
+    tile       TEXT NOT NULL,
+    place_id   TEXT NOT NULL,
+    lat        REAL NOT NULL,
+    lng        REAL NOT NULL,
+    value      TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (keyword, tile, place_id)
+);
+CREATE INDEX IF NOT EXISTS seen_places_expires ON seen_places (expires_at);
+
+CREATE TABLE IF NOT EXISTS coverage (
+    keyword    TEXT NOT NULL,
+    zoom       INTEGER NOT NULL,
+    tile       TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (keyword, zoom, tile)
+);
+CREATE INDEX IF NOT EXISTS coverage_expires ON coverage (expires_at);
+"""
+
+# Coverage is tracked on tiles this many levels below the search zoom
+# (a 1366×768 viewport spans ~21×12 of them); places are binned on
+# fixed PLACE_TILE_ZOOM tiles.
+COVER_ZOOM_OFFSET = 2
+PLACE_TILE_ZOOM   = 16
+
+# SQLite's default host-parameter limit is 999
+_IN_CHUNK = 500
+
+COMPRESS_LEVEL = 6
+# Budget eviction stops once the table is back under this share of it
+EVICT_TO = 0.9
+
+AGE_BUCKETS = [(3600, '<1h'), (3 * 3600, '1-3h'), (6 * 3600, '3-6h')]
+
+
+def _pack(text: str) -> bytes:
+    return zlib.compress(text.encode('utf-8'), COMPRESS_LEVEL)
+
+
+def _unpack(blob: bytes) -> str:
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def read_stats(path: str) -> dict:
+    """
+    Entries, bytes, hit ratio and age distribution of the cache file at
+    `path`, read over a separate read-only connection.
+    """
+    stats = {
+        'entries': 0, 'bytes': 0, 'expired': 0,
+        'file_bytes': 0, 'hits': 0, 'misses': 0,
+        'evictions': 0, 'hit_ratio': 0.0,
+        'ages': {label: 0 for _, label in AGE_BUCKETS},
+        'seen_places': 0, 'covered_tiles': 0,
+    }
+    stats['ages']['6h+'] = 0
+    if not os.path.exists(path):
+        return stats
+
+    for suffix in ('', '-wal'):
+        if os.path.exists(path + suffix):
+            stats['file_bytes'] += os.path.getsize(path + suffix)
+
+    now = time.time()
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            return stats
+        row = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), '
+            'COALESCE(SUM(expires_at <= ?), 0) FROM entries', (now,)
+        ).fetchone()
+        stats['entries'], stats['bytes'], stats['expired'] = row
+
+        lower = 0
+        for upper, label in AGE_BUCKETS:
+            stats['ages'][label] = conn.execute(
+                'SELECT COUNT(*) FROM entries '
+                'WHERE created_at > ? AND created_at <= ?',
+                (now - upper, now - lower)
+            ).fetchone()[0]
+            lower = upper
+        stats['ages']['6h+'] = conn.execute(
+            'SELECT COUNT(*) FROM entries WHERE created_at <= ?',
+            (now - lower,)
+        ).fetchone()[0]
+
+        for name, value in conn.execute('SELECT name, value FROM meta'):
+            stats[name] = value
+        stats['seen_places'] = conn.execute(
+            'SELECT COUNT(*) FROM seen_places').fetchone()[0]
+        stats['covered_tiles'] = conn.execute(
+            'SELECT COUNT(*) FROM coverage').fetchone()[0]
+    finally:
+        conn.close()
+
+    lookups = stats['hits'] + stats['misses']
+    if lookups:
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 3)
+    return stats
+
+
+class MemoryLRU:
+    """
+    Process-wide, thread-safe LRU bounded by total bytes.
+    Holds the UTF-8 encoded JSON, not the objects — every hit hands out
+    a fresh copy (the pipeline mutates place dicts while merging) and the
+    encoded length is an exact size to budget against.
+    """
+
+    def __init__(self, max_bytes: int, ttl: int):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items = OrderedDict()   # key -> (utf-8 json, expires_at)
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            data, expires_at = item
+            if expires_at <= time.time():
+                self._drop(key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+        return json.loads(data)
+
+    def put(self, key: str, text: str, expires_at: float = None):
+        data = text.encode()
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        if expires_at is None:
+            expires_at = time.time() + self.ttl
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            self._items[key] = (data, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old, _ = next(iter(self._items.items()))
+                self._drop(old)
+                self.evictions += 1
+
+    def _drop(self, key: str):
+        data, _ = self._items.pop(key)
+        self._bytes -= len(data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expired': self.expired,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class ScrapeCacheStore:
+    """
+    Thread-safe key → JSON value store with TTL.
+    All threads share one connection behind a lock; WAL keeps readers
+    in other processes from blocking on our writes.
+    """
+
+    def __init__(self, path: str, ttl: int, batch_size: int = 50,
+                 sweep_interval: int = 600, memory: MemoryLRU = None,
+                 max_bytes: int = 0):
+        self.path = path
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.sweep_interval = sweep_interval
+        self.memory = memory
+        self.max_bytes = max_bytes   # 0 = no budget
+
+        self._lock = threading.Lock()
+        self._pending = {}   # key -> (json_text, created_at, ttl)
+        self._warm = {}      # key -> value, filled by prefetch()
+        self._counts = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self._conn.executescript(
+                'DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS meta;'
+            )
+            self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self._conn.executescript(_SCHEMA)
+        self._bytes = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries'
+        ).fetchone()[0]
+
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, name='cache-sweeper', daemon=True
+        )
+        self._sweeper.start()
+
+    # ── reads ─────────────────────────────────────────────────────
+    def get(self, key: str):
+        return self.get_batch([key]).get(key)
+
+    def get_batch(self, keys) -> dict:
+        """
+        Live values for `keys`: memory tier first, then prefetched and
+        buffered entries, then one query for whatever is left.
+        """
+        keys = list(dict.fromkeys(keys))
+        out = {}
+        rest = []
+        for key in keys:
+            value = self.memory.get(key) if self.memory is not None else None
+            if value is not None:
+                out[key] = value
+            else:
+                rest.append(key)
+
+        if rest:
+            with self._lock:
+                missing = []
+                for key in rest:
+                    if key in self._warm:
+                        out[key] = self._warm.pop(key)
+                    elif key in self._pending:
+                        out[key] = json.loads(self._pending[key][0])
+                    else:
+                        missing.append(key)
+                rows = self._select_live_locked(missing)
+
+            for key, text, expires_at in rows:
+                try:
+                    out[key] = json.loads(text)
+                except ValueError:
+                    continue
+                if self.memory is not None:
+                    self.memory.put(key, text, expires_at)
+
+        with self._lock:
+            self._counts['hits'] += len(out)
+            self._counts['misses'] += len(keys) - len(out)
+        return out
+
+    def get_many(self, keys) -> dict:
+        """Every live entry among `keys`, in one query per 500 keys."""
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            rows = self._select_live_locked(keys)
+            found = {key: text for key, text, _ in rows}
+            for key in keys:
+                if key in self._pending:
+                    found[key] = self._pending[key][0]
+        out = {}
+        for key, text in found.items():
+            try:
+                out[key] = json.loads(text)
+            except ValueError:
+                continue
+        return out
+
+    def _select_live_locked(self, keys) -> list:
+        """(key, json_text, expires_at) for live rows; marks them read."""
+        now = time.time()
+        rows = []
+        for i in range(0, len(keys), _IN_CHUNK):
+            chunk = keys[i:i + _IN_CHUNK]
+            marks = ','.join('?' * len(chunk))
+            rows += self._conn.execute(
+                f'SELECT key, value, expires_at FROM entries '
+                f'WHERE key IN ({marks}) AND expires_at > ?',
+                (*chunk, now)
+            ).fetchall()
+        hit = [key for key, _, _ in rows]
+        for i in range(0, len(hit), _IN_CHUNK):
+            chunk = hit[i:i + _IN_CHUNK]
+            marks = ','.join('?' * len(chunk))
+            self._conn.execute(
+                f'UPDATE entries SET last_access = ? WHERE key IN ({marks})',
+                (now, *chunk)
+            )
+        out = []
+        for key, blob, expires_at in rows:
+            try:
+                out.append((key, _unpack(blob), expires_at))
+            except (zlib.error, UnicodeDecodeError):
+                continue
+        return out
+
+    def prefetch(self, keys) -> int:
+        """
+        Load every live entry among `keys` so the following get() calls
+        are served from memory. Returns the number of hits.
+        """
+        found = self.get_many(keys)
+        with self._lock:
+            self._warm.update(found)
+        return len(found)
+
+    def forget_prefetched(self, keys):
+        with self._lock:
+            for key in keys:
+                self._warm.pop(key, None)
+
+    # ── writes ────────────────────────────────────────────────────
+    def set(self, key: str, value, ttl: int = None):
+        ttls = {key: ttl} if ttl is not None else None
+        self.set_many({key: json.dumps(value, ensure_ascii=False)}, ttls)
+
+    def set_many(self, texts: dict, ttls: dict = None):
+        """
+        Buffer already-serialised entries; commits every batch_size.
+        `ttls` overrides the store TTL for individual keys.
+        """
+        ttls = ttls or {}
+        now = time.time()
+        if self.memory is not None:
+            for key, text in texts.items():
+                self.memory.put(key, text, now + ttls.get(key, self.ttl))
+        with self._lock:
+            for key, text in texts.items():
+                self._pending[key] = (text, now, ttls.get(key, self.ttl))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending and not any(self._counts.values()):
+            return
+        rows = []
+        for key, (text, created, ttl) in self._pending.items():
+            blob = _pack(text)
+            rows.append((
+                key, blob, len(blob), created, created + ttl, created
+            ))
+        self._pending = {}
+        try:
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO entries '
+                '(key, value, size, created_at, expires_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.executemany(
+                'INSERT INTO meta (name, value) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET value = value + excluded.value',
+                list(self._counts.items())
+            )
+            self._conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            self._conn.execute('ROLLBACK')
+            log.error('cache.flush_failed', error=str(e), rows=len(rows))
+            return
+        self._counts = dict.fromkeys(self._counts, 0)
+
+        # Replaced rows are double-counted here; the budget check
+        # below recounts exactly before evicting anything
+        self._bytes += sum(r[2] for r in rows)
+        if self.max_bytes and self._bytes > self.max_bytes:
+            self._enforce_budget_locked()
+
+    def _enforce_budget_locked(self):
+        self._bytes = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries'
+        ).fetchone()[0]
+        excess = self._bytes - int(self.max_bytes * EVICT_TO)
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in self._conn.execute(
+            'SELECT key, size FROM entries ORDER BY last_access'
+        ):
+            victims.append((key,))
+            excess -= size
+            self._bytes -= size
+            if excess <= 0:
+                break
+        self._conn.executemany('DELETE FROM entries WHERE key = ?', victims)
+        evicted = len(victims)
+        if evicted:
+            self._counts['evictions'] += evicted
+            log.info('cache.evicted', rows=evicted, bytes=self._bytes)
+
+    def stats(self) -> dict:
+        self.flush()
+        stats = read_stats(self.path)
+        stats['max_bytes'] = self.max_bytes
+        if self.memory is not None:
+            stats['memory'] = self.memory.stats()
+        return stats
+
+    def clear(self) -> int:
+        with self._lock:
+            self._pending = {}
+            self._warm = {}
+            removed = 0
+            for table in ('entries', 'seen_places', 'coverage'):
+                removed += self._conn.execute(
+                    f'DELETE FROM {table}').rowcount
+            self._bytes = 0
+        return removed
+
+    # ── spatial index ─────────────────────────────────────────────
+    def remember_viewport(self, keyword: str, zoom: int, bounds: dict,
+                          places: list, saturated: bool = False):
+        """
+        Record the places a search at `zoom` returned for `bounds`.
+        The viewport is only marked covered when the search was not
+        saturated (cut off at the result cap) and every place carried
+        coordinates — otherwise a later lookup could silently miss some.
+        """
+        keyword = keyword.lower()
+        expires_at = time.time() + self.ttl
+        rows = []
+        complete = not saturated
+        for p in places:
+            lat, lng = p.get('latitude'), p.get('longitude')
+            if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+                complete = False
+                continue
+            rows.append((
+                keyword, tile_key(lat, lng, PLACE_TILE_ZOOM), p['place_id'],
+                lat, lng, json.dumps(p, ensure_ascii=False), expires_at
+            ))
+        tiles = tiles_in(bounds, zoom + COVER_ZOOM_OFFSET, inner=True)
+
+        with self._lock:
+            try:
+                self._conn.execute('BEGIN')
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO seen_places '
+                    '(keyword, tile, place_id, lat, lng, value, expires_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                if complete:
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO coverage '
+                        '(keyword, zoom, tile, expires_at) VALUES (?, ?, ?, ?)',
+                        [(keyword, zoom, t, expires_at) for t in tiles]
+                    )
+                self._conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                self._conn.execute('ROLLBACK')
+                log.error('cache.spatial_write_failed', error=str(e))
+
+    def lookup_viewport(self, keyword: str, zoom: int, bounds: dict):
+        """
+        Places already seen for `keyword` inside `bounds`, if searches
+        at this zoom have covered every tile it touches within TTL.
+        Returns None when any part of the viewport is uncovered.
+        """
+        keyword = keyword.lower()
+        tiles = tiles_in(bounds, zoom + COVER_ZOOM_OFFSET)
+        place_tiles = tiles_in(bounds, PLACE_TILE_ZOOM)
+        now = time.time()
+
+        with self._lock:
+            covered = 0
+            for i in range(0, len(tiles), _IN_CHUNK):
+                chunk = tiles[i:i + _IN_CHUNK]
+                marks = ','.join('?' * len(chunk))
+                covered += self._conn.execute(
+                    f'SELECT COUNT(*) FROM coverage '
+                    f'WHERE keyword = ? AND zoom = ? AND tile IN ({marks}) '
+                    f'AND expires_at > ?',
+                    (keyword, zoom, *chunk, now)
+                ).fetchone()[0]
+            if covered < len(tiles):
+                return None
+
+            rows = []
+            for i in range(0, len(place_tiles), _IN_CHUNK):
+                chunk = place_tiles[i:i + _IN_CHUNK]
+                marks = ','.join('?' * len(chunk))
+                rows += self._conn.execute(
+                    f'SELECT place_id, lat, lng, value FROM seen_places '
+                    f'WHERE keyword = ? AND tile IN ({marks}) '
+                    f'AND expires_at > ?',
+                    (keyword, *chunk, now)
+                ).fetchall()
+
+        places = {}
+        for place_id, lat, lng, value in rows:
+            if place_id not in places and contains(bounds, lat, lng):
+                places[place_id] = json.loads(value)
+        return list(places.values())
+
+    # ── expiry ────────────────────────────────────────────────────
+    def sweep(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._lock:
+            self._flush_locked()
+            for table in ('entries', 'seen_places', 'coverage'):
+                removed += self._conn.execute(
+                    f'DELETE FROM {table} WHERE expires_at <= ?', (now,)
+                ).rowcount
+            if self.max_bytes:
+                self._enforce_budget_locked()
+        return removed
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                removed = self.sweep()
+                if removed:
+                    log.info('cache.swept', removed=removed)
+            except Exception as e:
+                log.error('cache.sweep_failed', error=str(e))
+
+
+# ── ASYNC FRONT END ────────────────────────────────────────────────
+_io_executor = None
+_io_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """The one thread every cache file operation in the process runs on."""
+    global _io_executor
+    with _io_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='cache-io'
+            )
+        return _io_executor
+
+
+class AsyncScrapeCache:
+    """
+    Non-blocking view of a ScrapeCacheStore for one event loop.
+
+    - Memory-tier hits return without leaving the loop.
+    - Misses issued in the same loop tick are gathered into one
+      get_batch() call on the cache I/O thread.
+    - Writes are serialised on the spot, coalesced in memory and handed
+      to the I/O thread in batches after WRITE_DELAY; readers see them
+      immediately.
+    """
+
+    WRITE_DELAY = 0.5
+    WRITE_BATCH = 50
+
+    def __init__(self, store: ScrapeCacheStore, executor=None):
+        self.store = store
+        self.executor = executor or get_io_executor()
+        self._reads = {}      # key -> [futures]
+        self._writes = {}     # key -> json text
+        self._ttls = {}       # key -> ttl, for entries not on the store TTL
+        self._read_handle = None
+        self._write_handle = None
+        self._inflight = set()
+
+    def _run(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(
+            self.executor, fn, *args
+        )
+
+    # ── reads ─────────────────────────────────────────────────────
+    async def get(self, key: str):
+        if key in self._writes:
+            return json.loads(self._writes[key])
+        if self.store.memory is not None:
+            value = self.store.memory.get(key)
+            if value is not None:
+                return value
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._reads.setdefault(key, []).append(fut)
+        if self._read_handle is None:
+            self._read_handle = loop.call_soon(self._dispatch_reads)
+        return await fut
+
+    def _dispatch_reads(self):
+        self._read_handle = None
+        waiting, self._reads = self._reads, {}
+        task = asyncio.ensure_future(
+            self._run(self.store.get_batch, list(waiting))
+        )
+
+        def deliver(done):
+            try:
+                found = done.result()
+            except Exception as e:
+                log.error('cache.read_failed', error=str(e))
+                found = {}
+            for key, futs in waiting.items():
+                for i, fut in enumerate(futs):
+                    if fut.done():
+                        continue
+                    value = found.get(key)
+                    # Each waiter gets its own copy
+                    if i and value is not None:
+                        value = json.loads(json.dumps(value))
+                    fut.set_result(value)
+
+        task.add_done_callback(deliver)
+
+    async def lookup_viewport(self, keyword: str, zoom: int, bounds: dict):
+        return await self._run(
+            self.store.lookup_viewport, keyword, zoom, bounds
+        )
+
+    async def prefetch(self, keys) -> int:
+        return await self._run(self.store.prefetch, keys)
+
+    # ── writes ────────────────────────────────────────────────────
+    def set(self, key: str, value, ttl: int = None):
+        self._writes[key] = json.dumps(value, ensure_ascii=False)
+        if ttl is not None:
+            self._ttls[key] = ttl
+        else:
+            self._ttls.pop(key, None)
+        if len(self._writes) >= self.WRITE_BATCH:
+            self._dispatch_writes()
+        elif self._write_handle is None:
+            self._write_handle = asyncio.get_running_loop().call_later(
+                self.WRITE_DELAY, self._dispatch_writes
+            )
+
+    def _dispatch_writes(self):
+        if self._write_handle is not None:
+            self._write_handle.cancel()
+            self._write_handle = None
+        if not self._writes:
+            return
+        batch, self._writes = self._writes, {}
+        ttls, self._ttls = self._ttls, {}
+        self._track(self._run(self.store.set_many, batch, ttls))
+
+    def remember_viewport(self, keyword: str, zoom: int, bounds: dict,
+                          places: list, saturated: bool = False):
+        # Shallow copies: the pipeline keeps enriching the originals
+        places = [dict(p) for p in places]
+        self._track(self._run(
+            self.store.remember_viewport, keyword, zoom, bounds, places,
+            saturated
+        ))
+
+    def _track(self, fut):
+        fut = asyncio.ensure_future(fut)
+        self._inflight.add(fut)
+        fut.add_done_callback(self._inflight.discard)
+
+    async def close(self, prefetched=()):
+        """Push every queued write to disk and drop unread prefetches."""
+        self._dispatch_writes()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self._run(self.store.flush)
+        await self._run(self.store.forget_prefetched, list(prefetched))
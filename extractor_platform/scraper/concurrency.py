@@ -1,22 +1,238 @@
 # scraper/concurrency.py
 import psutil
 import asyncio
+import statistics
+import threading
+from collections import deque
+import structlog
+
+log = structlog.get_logger()
 
 def get_optimal_concurrency() -> dict:
     """
     Calculate safe concurrency based on current system resources.
     """
     ram = psutil.virtual_memory()
-    cpu = psutil.cpu_count(logical=False)
+    cpu = psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
     ram_available_gb = ram.available / (1024 ** 3)
 
     # Each HTTP request uses ~5MB RAM
     # Each Playwright context uses ~150MB RAM
     http_limit = min(50, int(ram_available_gb * 8))
     playwright_limit = min(8, max(2, int(ram_available_gb / 0.3)))
+    # HTML parsing is CPU-bound — one process per core, leave one
+    # core for the event loops
+    parse_limit = min(8, max(1, cpu - 1))
 
     return {
         'http': http_limit,
         'playwright': playwright_limit,
+        'parse': parse_limit,
         'recommended_grid': 8 if ram_available_gb > 4 else 5,
     }
+
+
+# ── AIMD LIMITER ───────────────────────────────────────────────────
+# Outcomes that mean upstream wants us to slow down
+PRESSURE_OUTCOMES = {'blocked', 'http_429', 'http_503', 'timeout'}
+
+AIMD_WINDOW     = 20     # outcomes judged together
+AIMD_BACKOFF_AT = 0.10   # pressure share of a window that triggers a cut
+AIMD_DECREASE   = 0.5    # multiplicative cut
+AIMD_INCREASE   = 1      # additive raise after a healthy window
+AIMD_SLOW_SEC   = 4.0    # median latency above this holds the limit
+AIMD_MIN        = 2
+AIMD_MAX_FLOOR  = 10     # ceiling never drops below this on small machines
+HTTP_START      = 30
+
+
+class AIMDLimiter:
+    """
+    Semaphore whose size adapts to upstream health (`async with` it).
+
+    Callers report each request with record(outcome, latency). Every
+    AIMD_WINDOW outcomes the limit is raised by AIMD_INCREASE if the
+    window was healthy, held if it was slow, and cut by AIMD_DECREASE if
+    blocks / 429s / timeouts passed AIMD_BACKOFF_AT.
+    """
+
+    def __init__(self, initial: int, min_limit: int = AIMD_MIN,
+                 max_limit: int = None, name: str = 'http'):
+        self.max_limit = max(max_limit or initial, min_limit)
+        self.min_limit = min_limit
+        self.limit = max(min_limit, min(initial, self.max_limit))
+        self.name = name
+        self.reason = 'start'
+        self.adjustments = 0
+        self._in_flight = 0
+        self._waiters = deque()
+        self._outcomes = []
+        self._latencies = []
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        """Take a free slot without waiting; pair with release()."""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return True
+        return False
+
+    def release(self):
+        self._release()
+
+    async def __aenter__(self):
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return self
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # Slot handed over just as we were cancelled: give it back
+            if fut.done() and not fut.cancelled():
+                self._release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._release()
+
+    def _release(self):
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._in_flight < self.limit:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self._in_flight += 1
+                fut.set_result(None)
+
+    def record(self, outcome: str, latency: float = None):
+        self._outcomes.append(outcome)
+        if latency is not None:
+            self._latencies.append(latency)
+        if len(self._outcomes) >= AIMD_WINDOW:
+            self._adjust()
+
+    def _adjust(self):
+        outcomes, self._outcomes = self._outcomes, []
+        latencies, self._latencies = self._latencies, []
+        pressure = sum(o in PRESSURE_OUTCOMES for o in outcomes)
+        p50 = statistics.median(latencies) if latencies else 0.0
+        old = self.limit
+
+        if pressure / len(outcomes) >= AIMD_BACKOFF_AT:
+            self.limit = max(self.min_limit, int(self.limit * AIMD_DECREASE))
+            self.reason = f'backoff: {pressure}/{len(outcomes)} blocked/429/timeout'
+        elif p50 > AIMD_SLOW_SEC:
+            self.reason = f'hold: p50 {p50:.1f}s'
+        else:
+            self.limit = min(self.max_limit, self.limit + AIMD_INCREASE)
+            self.reason = 'healthy' if self.limit > old else 'at ceiling'
+
+        if self.limit != old:
+            self.adjustments += 1
+            log.info('aimd.adjust', name=self.name, old=old, new=self.limit,
+                     reason=self.reason, p50=round(p50, 2))
+            self._wake()
+
+    def describe(self) -> str:
+        return f'{self.limit} ({self.reason})'
+
+
+def make_http_limiter(initial: int = HTTP_START) -> AIMDLimiter:
+    """HTTP limiter bounded above by what available RAM allows."""
+    ceiling = max(AIMD_MAX_FLOOR, get_optimal_concurrency()['http'])
+    return AIMDLimiter(initial, max_limit=max(ceiling, AIMD_MIN))
+
+
+# ── LATENCY TRACKING ───────────────────────────────────────────────
+LATENCY_SAMPLES  = 200    # recent requests per egress kept for percentiles
+LATENCY_WARMUP   = 20     # samples before timeouts / hedging adapt
+TIMEOUT_P95_MULT = 2.0    # timeout = p95 × this, clamped to the bounds
+TIMEOUT_MIN_SEC  = 4.0
+TIMEOUT_MAX_SEC  = 15.0
+HEDGE_MAX_SHARE  = 0.10   # hedges allowed per request sent
+
+
+class LatencyTracker:
+    """
+    Rolling latency window for one egress (direct connection, a proxy).
+    Sets request timeouts from its p95 and decides when a request has
+    run long enough to deserve a hedged duplicate.
+    """
+
+    def __init__(self, egress: str):
+        self.egress = egress
+        self._samples = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float):
+        with self._lock:
+            if len(self._samples) < LATENCY_WARMUP:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout(self) -> float:
+        p95 = self.percentile(0.95)
+        if p95 is None:
+            return TIMEOUT_MAX_SEC
+        return min(TIMEOUT_MAX_SEC, max(TIMEOUT_MIN_SEC, p95 * TIMEOUT_P95_MULT))
+
+    def hedge_after(self):
+        """Seconds to wait before hedging this request, or None to never."""
+        with self._lock:
+            self.requests += 1
+            if self.hedges >= self.requests * HEDGE_MAX_SHARE:
+                return None
+        return self.percentile(0.95)
+
+    def note_hedge(self):
+        with self._lock:
+            self.hedges += 1
+
+    def snapshot(self) -> dict:
+        return {
+            'egress': self.egress,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'timeout': self.timeout(),
+        }
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(egress: str) -> LatencyTracker:
+    """Process-wide tracker per egress, shared by every job."""
+    with _trackers_lock:
+        if egress not in _trackers:
+            _trackers[egress] = LatencyTracker(egress)
+        return _trackers[egress]
+
+
+def summarize_latencies(samples) -> dict:
+    """p50 / p95 / p99 / max of a job's request latencies, in seconds."""
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        'p50': round(pick(0.5), 2),
+        'p95': round(pick(0.95), 2),
+        'p99': round(pick(0.99), 2),
+        'max': round(ordered[-1], 2),
+    }
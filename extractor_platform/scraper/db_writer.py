@@ -1,77 +1,119 @@
+# scraper/db_writer.py
+# ─────────────────────────────────────────────────────────────────
+# Batched place writer for one keyword job.
+#
+# New places and enrichments of known ones are buffered by dedup key
+# and written as one multi-row upsert (INSERT … ON CONFLICT
+# (keyword_job, place_id) DO UPDATE) per batch, so a job costs one
+# transaction per WRITE_BATCH places instead of one per place.
+# ─────────────────────────────────────────────────────────────────
 import asyncio
-import threading
-from queue import Queue
+import time
+import structlog
 
-class AsyncDBWriter:
+log = structlog.get_logger()
+
+WRITE_BATCH     = 100   # rows per upsert
+WRITE_EVERY_SEC = 2     # oldest a buffered row gets while puts keep coming
+
+# Fields a later sighting of the same place may fill in; the upsert
+# refreshes these on conflict
+ENRICH_FIELDS = [
+    'phone', 'website', 'rating', 'review_count', 'street',
+    'city', 'state', 'category', 'latitude', 'longitude',
+]
+PLACE_FIELDS = ['name', 'maps_url'] + ENRICH_FIELDS
+COORD_FIELDS = ('latitude', 'longitude')
+
+
+class PlaceWriter:
     """
-    Collects results in memory, writes to DB in batches.
-    Never blocks the scraping loop.
+    Collects places on the event loop and upserts them in batches.
+    put() writes the batch itself once it is due, and waits for any
+    write already running — that wait is the backpressure that keeps
+    the search fan-out from outrunning the database.
     """
 
-    def __init__(self, keyword_job_id: int, batch_size: int = 50):
+    def __init__(self, keyword_job_id: int,
+                 batch_size: int = WRITE_BATCH,
+                 flush_every: float = WRITE_EVERY_SEC):
         self.keyword_job_id = keyword_job_id
         self.batch_size = batch_size
-        self.queue = Queue()
-        self.seen = set()
-        self.count = 0
-        self._start_writer()
+        self.flush_every = flush_every
+        self._pending = {}   # dedup key → latest merged place dict
+        self._lock = asyncio.Lock()
+        self._last = time.monotonic()
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    async def put(self, key: str, place: dict):
+        """Queue a new or enriched place; a later put of the same key wins."""
+        self._pending[key] = place
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last >= self.flush_every):
+            await self.flush()
+
+    async def flush(self):
+        """Write everything buffered, after any write already running."""
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._last = time.monotonic()
+            await self._write(batch)
 
-    def _start_writer(self):
-        """Background thread that drains queue and writes to DB."""
-        def writer_loop():
-            batch = []
-            while True:
-                try:
-                    item = self.queue.get(timeout=2.0)
-                    if item is None:  # Poison pill — stop signal
-                        if batch:
-                            self._flush(batch)
-                        break
-                    batch.append(item)
-                    if len(batch) >= self.batch_size:
-                        self._flush(batch)
-                        batch = []
-                except Exception:
-                    # Timeout reading from queue, flush what we have
-                    if batch:
-                        self._flush(batch)
-                        batch = []
+    async def close(self) -> int:
+        await self.flush()
+        log.info('db_writer.closed',
+                 keyword_job_id=self.keyword_job_id,
+                 written=self.written,
+                 batches=self.batches,
+                 failed=self.failed)
+        return self.written
 
-        self.thread = threading.Thread(
-            target=writer_loop, daemon=True
+    def _row(self, key: str, place: dict):
+        from jobs.models import Place
+
+        fields = {f: place.get(f) or '' for f in PLACE_FIELDS}
+        for f in COORD_FIELDS:
+            # Parsers leave '' for a missing coordinate; the column is nullable
+            fields[f] = place.get(f) if place.get(f) not in ('', None) else None
+        return Place(
+            keyword_job_id=self.keyword_job_id,
+            # Rows without an id are stored under their dedup key so the
+            # upsert still has a conflict target
+            place_id=place.get('place_id') or key,
+            **fields,
         )
-        self.thread.start()
 
-    def _flush(self, batch: list):
-        """Write a batch to DB in one transaction."""
+    async def _upsert(self, rows: list):
         from jobs.models import Place
-        from django.db import transaction
 
+        await Place.objects.abulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['keyword_job', 'place_id'],
+            update_fields=ENRICH_FIELDS,
+        )
+
+    async def _write(self, batch: dict):
+        rows = [self._row(k, p) for k, p in batch.items()]
         try:
-            with transaction.atomic():
-                Place.objects.bulk_create(
-                    [Place(keyword_job_id=self.keyword_job_id, **p)
-                     for p in batch],
-                    ignore_conflicts=True,
-                )
-            self.count += len(batch)
+            await self._upsert(rows)
+            self.written += len(rows)
+            self.batches += 1
+            return
         except Exception as e:
-            pass  # Log error
-
-    def add(self, place: dict) -> bool:
-        """Add a place — returns True if new, False if duplicate."""
-        key = (
-            place.get('name', '').lower().strip()
-            + place.get('street', '').lower()[:15]
-        )
-        if key in self.seen or not place.get('name'):
-            return False
-        self.seen.add(key)
-        self.queue.put(place)
-        return True
+            log.warning('db_writer.batch_failed',
+                        rows=len(rows), error=str(e)[:80])
 
-    def stop(self):
-        """Signal writer to finish and wait for it."""
-        self.queue.put(None)
-        self.thread.join(timeout=10)
-        return self.count
+        # One bad row must not cost the whole batch
+        for row in rows:
+            try:
+                await self._upsert([row])
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                log.error('db_writer.row_failed',
+                          place_id=row.place_id[:40], error=str(e)[:80])
@@ -0,0 +1,308 @@
+# scraper/parser.py
+# ─────────────────────────────────────────────────────────────────
+# Single-pass Maps HTML parser.
+#
+# Walks the document ONCE looking for place ids. Every field lookup is
+# a precompiled pattern run with pos/endpos bounds around the id, so
+# nothing is sliced, nothing is re-scanned from the top of the page and
+# no regex is built per id.
+# ─────────────────────────────────────────────────────────────────
+import re
+import json
+from urllib.parse import quote
+
+MAX_PLACES  = 120
+PRE_WINDOW  = 600    # chars before a place id searched for fields
+POST_WINDOW = 800    # chars after a place id searched for fields
+NAME_WINDOW = 400    # chars before a place id searched for the name
+
+# Compiled twice: for str pages and for raw bytes bodies, so the bytes
+# path never has to decode more than the matched groups.
+_SOURCES = {
+    'pid':    r'ChIJ[a-zA-Z0-9_\-]{10,40}',
+    # Quoted string ending right before the id (\Z binds to endpos)
+    'name':   r'"([A-Za-z0-9][^"]{3,80})"[^"]{0,200}\Z',
+    'cand':   r'"([A-Za-z][^"]{4,60})"',
+    'phone':  r'(\+?[0-9][0-9\s\-\(\)]{8,18}[0-9])',
+    'rating': r'"([1-5]\.[0-9])"',
+    'review': r'"(\d{1,6})"(?=[^"]{0,30}"review)',
+    'web':    (
+        r'"(https?://(?!(?:www\.google|maps\.google|goo\.gl|googleapis|gstatic))'
+        r'[^"]{5,120})"'
+    ),
+}
+_STR   = {k: re.compile(v) for k, v in _SOURCES.items()}
+_BYTES = {k: re.compile(v.encode()) for k, v in _SOURCES.items()}
+
+
+def _patterns(doc) -> dict:
+    return _STR if isinstance(doc, str) else _BYTES
+
+
+def _s(value) -> str:
+    if isinstance(value, str):
+        return value
+    return bytes(value).decode('utf-8', errors='replace')
+
+
+def _name_for(html, idx: int) -> str:
+    pat = _patterns(html)
+    nm = pat['name'].search(html, max(0, idx - NAME_WINDOW), idx)
+    if nm:
+        return _s(nm.group(1)).strip()
+    candidates = [
+        s for s in map(_s, pat['cand'].findall(html, max(0, idx - 300), idx))
+        if not s.startswith('http') and '\\' not in s
+    ]
+    return candidates[-1] if candidates else ''
+
+
+def _first(pattern, html, start: int, end: int) -> str:
+    m = pattern.search(html, start, end)
+    return _s(m.group(1)) if m else ''
+
+
+def iter_places(html):
+    """
+    Yield place dicts in document order, scanning `html` once.
+    `html` may be str or bytes; with bytes only matched spans are decoded.
+
+    Each id is handled at its first occurrence; field lookups are
+    bounded to the PRE/POST windows around it with precompiled
+    patterns, so total work is one pass plus O(ids × window).
+    """
+    pat = _patterns(html)
+    seen = set()
+
+    for m in pat['pid'].finditer(html):
+        pid = _s(m.group(0))
+        if pid in seen:
+            continue
+        seen.add(pid)
+        if len(seen) > MAX_PLACES:
+            return
+
+        idx = m.start()
+        name = _name_for(html, idx)
+        if not name or len(name) < 3:
+            continue
+
+        start, end = max(0, idx - PRE_WINDOW), idx + POST_WINDOW
+        phone = _first(pat['phone'], html, start, end)
+
+        yield {
+            'place_id':     pid,
+            'name':         name,
+            'phone':        phone.strip(),
+            'website':      _first(pat['web'], html, start, end),
+            'rating':       _first(pat['rating'], html, start, end),
+            'review_count': _first(pat['review'], html, start, end),
+            'street': '', 'city': '', 'state': '',
+            'category': '', 'latitude': '', 'longitude': '',
+            'maps_url': (
+                f'https://www.google.com/maps/search/?api=1'
+                f'&query={quote(name)}&query_place_id={pid}'
+            ),
+        }
+
+
+# ── APP_INITIALIZATION_STATE DECODER ──────────────────────────────
+# The search page embeds its results as JSON. Result rows are long
+# positional arrays; the indexes below are where each field lives.
+APP_STATE_MARKER = 'window.APP_INITIALIZATION_STATE='
+XSSI_PREFIX      = ")]}'"
+
+PLACE_FIELDS = {
+    'name':         (11,),
+    'place_id':     (78,),
+    'latitude':     (9, 2),
+    'longitude':    (9, 3),
+    'category':     (13, 0),
+    'rating':       (4, 7),
+    'review_count': (4, 8),
+    'website':      (7, 0),
+    'phone':        (178, 0, 0),
+    'street':       (183, 1, 2),
+    'city':         (183, 1, 3),
+    'state':        (183, 1, 5),
+}
+
+_json = json.JSONDecoder()
+
+
+def _dig(node, path):
+    for i in path:
+        if not isinstance(node, list) or i >= len(node):
+            return None
+        node = node[i]
+    return node
+
+
+def _is_place_node(node) -> bool:
+    pid = _dig(node, PLACE_FIELDS['place_id'])
+    name = _dig(node, PLACE_FIELDS['name'])
+    return (
+        isinstance(pid, str) and pid.startswith('ChIJ')
+        and isinstance(name, str) and bool(name.strip())
+    )
+
+
+def _text(value) -> str:
+    if value is None or isinstance(value, (list, dict)):
+        return ''
+    return str(value).strip()
+
+
+def _coord(value):
+    return value if isinstance(value, (int, float)) else ''
+
+
+def _place_from_node(node) -> dict:
+    get = lambda field: _dig(node, PLACE_FIELDS[field])
+    name = _text(get('name'))
+    pid  = _text(get('place_id'))
+
+    street = _text(get('street'))
+    if not street:
+        # Older payloads only carry the formatted address lines
+        street = _text(_dig(node, (2, 0)))
+
+    return {
+        'place_id':     pid,
+        'name':         name,
+        'phone':        _text(get('phone')),
+        'website':      _text(get('website')),
+        'rating':       _text(get('rating')),
+        'review_count': _text(get('review_count')),
+        'street':       street,
+        'city':         _text(get('city')),
+        'state':        _text(get('state')),
+        'category':     _text(get('category')),
+        'latitude':     _coord(get('latitude')),
+        'longitude':    _coord(get('longitude')),
+        'maps_url': (
+            f'https://www.google.com/maps/search/?api=1'
+            f'&query={quote(name)}&query_place_id={pid}'
+        ),
+    }
+
+
+def _load_app_state(html):
+    if isinstance(html, str):
+        idx = html.find(APP_STATE_MARKER)
+        if idx == -1:
+            return None
+        span, start = html, idx + len(APP_STATE_MARKER)
+    else:
+        # Decode only the payload's own <script> span, not the page
+        marker = APP_STATE_MARKER.encode()
+        idx = html.find(marker)
+        if idx == -1:
+            return None
+        end = html.find(b'</script>', idx)
+        span = _s(html[idx + len(marker):end if end != -1 else len(html)])
+        start = 0
+    try:
+        state, _ = _json.raw_decode(span, start)
+    except ValueError:
+        return None
+    return state
+
+
+def decode_app_state(html) -> list:
+    """
+    Decode full place records (coordinates, address parts, category)
+    from the window.APP_INITIALIZATION_STATE payload.
+    Returns [] when the payload is missing or holds no places.
+    """
+    state = _load_app_state(html)
+    if state is None:
+        return []
+
+    places = []
+    seen = set()
+    stack = [state]
+
+    while stack and len(places) < MAX_PLACES:
+        node = stack.pop()
+
+        if isinstance(node, str):
+            # Search results ride inside XSSI-prefixed JSON strings
+            if node.startswith(XSSI_PREFIX):
+                try:
+                    stack.append(json.loads(node[len(XSSI_PREFIX):]))
+                except ValueError:
+                    pass
+            continue
+        if not isinstance(node, list):
+            continue
+
+        if _is_place_node(node):
+            place = _place_from_node(node)
+            if place['place_id'] not in seen:
+                seen.add(place['place_id'])
+                places.append(place)
+            continue
+
+        # Reversed so results come out in document order
+        stack.extend(reversed(node))
+
+    return places
+
+
+BLOCK_MARKERS = (
+    'unusual traffic', 'captcha',
+    'before you continue', 'not a robot',
+)
+_BLOCK_MARKERS_B = tuple(m.encode() for m in BLOCK_MARKERS)
+
+# Block / consent / captcha pages announce themselves near the top;
+# bytes bodies are only checked this far in
+BLOCK_SCAN_BYTES = 64 * 1024
+
+
+def is_blocked(body) -> bool:
+    if isinstance(body, str):
+        low = body.lower()
+        return any(x in low for x in BLOCK_MARKERS)
+    head = bytes(body[:BLOCK_SCAN_BYTES]).lower()
+    return any(x in head for x in _BLOCK_MARKERS_B)
+
+
+def parse_response(html) -> tuple:
+    """
+    Everything http_one does with a fetched page, as one picklable call
+    so it can run in the parse process pool. Accepts the decoded text
+    or the raw bytes body.
+    Returns (places, method_string).
+    """
+    if is_blocked(html):
+        return [], 'blocked'
+
+    marker = 'ChIJ' if isinstance(html, str) else b'ChIJ'
+    if marker not in html:
+        return [], 'no_data'
+
+    places = parse_html(html)
+    if places:
+        return places, 'http'
+    return [], 'parse_failed'
+
+
+def parse_html(html) -> list:
+    """
+    Full records from the structured payload first; ids it didn't
+    cover are picked up by the single-pass scan.
+    """
+    places = decode_app_state(html)
+    if not places:
+        return list(iter_places(html))
+
+    seen = {p['place_id'] for p in places}
+    for p in iter_places(html):
+        if len(places) >= MAX_PLACES:
+            break
+        if p['place_id'] not in seen:
+            seen.add(p['place_id'])
+            places.append(p)
+    return places
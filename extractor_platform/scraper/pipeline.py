@@ -8,34 +8,134 @@
 # ─────────────────────────────────────────────────────────────────
 import asyncio
 import aiohttp
+import contextlib
 import re
 import json
 import random
 import hashlib
+import itertools
+import math
 import os
 import time
+import threading
+import multiprocessing
 import structlog
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import quote
 from playwright.async_api import async_playwright
 
 log = structlog.get_logger()
 
 from .location_resolver import resolve_location_cached
+from .parser import (
+    parse_html, parse_response, is_blocked,
+    APP_STATE_MARKER, BLOCK_SCAN_BYTES,
+)
+from .concurrency import (
+    get_optimal_concurrency, make_http_limiter,
+    get_latency_tracker, summarize_latencies,
+)
+from .cache_store import ScrapeCacheStore, MemoryLRU, AsyncScrapeCache
+from .tiles import viewport, contains
+from .runtime import new_http_session, launch_browser
+from .work_queue import WorkQueue, PRIORITY_FOLLOW_UP
+from .db_writer import PlaceWriter, ENRICH_FIELDS
 
 # ── CONFIGURATION ──────────────────────────────────────────────────
-# All zoom levels searched simultaneously per cell
+# Zoom levels searched per cell, coarsest first
 ZOOM_LEVELS = [14, 15, 16]
 
+# 'all'      — every cell at every zoom, fired together
+# 'adaptive' — every cell at the coarsest zoom; a cell moves one zoom
+#              deeper only when it came back near the per-search result
+#              cap, or that deeper zoom has been adding new places.
+#              Skips deeper zooms for unsaturated cells, so it can find
+#              fewer places; opt in only after comparing place counts
+#              against 'all' on the same locations
+ZOOM_MODE         = 'all'
+SEARCH_RESULT_CAP = 20     # results one Maps search page returns at most
+ZOOM_SATURATION   = 0.8    # share of the cap that counts as saturated
+ZOOM_MIN_YIELD    = 1.0    # new places per search worth a deeper zoom
+ZOOM_YIELD_WARMUP = 12     # deeper searches run before the yield is trusted
+
+# 'uniform'  — grid_size × grid_size cells, searched per ZOOM_MODE
+# 'quadtree' — a coarse grid (grid_size / QUADTREE_ROOT_DIVISOR a side);
+#              each cell is searched at the deepest zoom whose
+#              SPATIAL_VIEWPORT still shows all of it, and a saturated
+#              cell is split into four children, down to
+#              QUADTREE_MIN_CELL_DEG.
+#              Ignores ZOOM_MODE; opt in only after comparing place
+#              counts against 'uniform' on the same locations
+GRID_MODE             = 'uniform'
+QUADTREE_ROOT_DIVISOR = 4
+QUADTREE_MIN_CELL_DEG = 0.004   # ~450 m a side
+QUADTREE_MAX_ZOOM     = 18
+
 # How many HTTP requests fire at the same time
 # 8×8 grid × 4 zooms = 256 tasks — semaphore controls batching
+# Starting in-flight limit; an AIMD controller moves it between 2 and
+# a RAM-derived ceiling as blocks / timeouts come and go
 HTTP_CONCURRENCY   = 30   # Safe without proxies
 PLAYWRIGHT_CONCURRENCY = 5
 
-# Cache
+# Timeouts follow each egress's recent p95 (scraper/concurrency.py);
+# a request still running past the p95 gets one hedged duplicate, when
+# the HTTP limiter has a spare slot for it
+HEDGE_REQUESTS = True
+EGRESS_DIRECT  = 'direct'
+
+# Keep response bodies as raw bytes: block checks scan a bounded head
+# and only the spans holding place fields are ever decoded
+HTTP_BYTES_MODE = True
+
+# Read bodies in chunks: bail out as soon as the head shows a block page
+# and hang up once the APP_INITIALIZATION_STATE script has fully arrived
+# (everything after it is markup we never parse). Needs HTTP_BYTES_MODE.
+HTTP_STREAM_MODE = True
+STREAM_CHUNK     = 64 * 1024
+
+# Cache — one SQLite file (see cache_store.py), not a file per entry
 CACHE_DIR = 'scraper_cache'
+CACHE_DB  = os.path.join(CACHE_DIR, 'scrape_cache.sqlite3')
 CACHE_TTL = 3600 * 6
+# Compressed bytes the file may hold before least-recently-read entries
+# are evicted (0 = unbounded)
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# In-memory LRU in front of the file, shared by every keyword thread
+CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+# Answer a cell from places already seen when earlier searches at the
+# same zoom covered its whole viewport (assumed SPATIAL_VIEWPORT px)
+SPATIAL_CACHE    = True
+SPATIAL_VIEWPORT = (1366, 768)
+# Cells that came back empty are remembered too, for as long as the
+# reason is likely to hold. 'empty' = the browser's results feed
+# rendered with no results; those cells skip both HTTP and the browser
+# on later runs. 'no_feed' = the feed never rendered (consent wall,
+# block page, single-place redirect, slow load), so it proves nothing
+# and is only held briefly. Other reasons skip HTTP and go straight to
+# the browser.
+NEGATIVE_CACHE = True
+NEGATIVE_TTLS  = {
+    'empty':        3600 * 72,
+    'no_data':      3600 * 12,
+    'parse_failed': 3600,
+    'no_feed':      60 * 30,
+    'blocked':      60 * 15,
+}
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# Finished (cell, zoom) searches are saved as CellCheckpoint rows so an
+# interrupted job resumes where it stopped; written every
+# CHECKPOINT_BATCH searches or CHECKPOINT_EVERY_SEC, whichever is first
+CHECKPOINT_BATCH     = 25
+CHECKPOINT_EVERY_SEC = 5
+
+# Live progress is kept on the in-memory KeywordJob and written at most
+# this often, touching only the columns the status views poll
+PROGRESS_EVERY_SEC = 1.0
+PROGRESS_FIELDS    = ['cells_done', 'total_cells', 'total_extracted',
+                      'status_message']
+
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
@@ -133,165 +233,356 @@ def _ckey(lat, lng, zoom, kw):
     ).hexdigest()
 
 
+def _unit_key(task: dict) -> str:
+    """Stable id of one (cell, zoom) search, for CellCheckpoint rows."""
+    return f"{task['lat']:.6f},{task['lng']:.6f},{task['zoom']}"
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache() -> ScrapeCacheStore:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScrapeCacheStore(
+                CACHE_DB, CACHE_TTL,
+                memory=MemoryLRU(CACHE_MEMORY_BYTES, CACHE_TTL),
+                max_bytes=CACHE_MAX_BYTES,
+            )
+        return _cache
+
+
 def cache_get(lat, lng, zoom, kw):
-    path = os.path.join(CACHE_DIR, _ckey(lat, lng, zoom, kw) + '.json')
-    if not os.path.exists(path):
-        return None
-    if time.time() - os.path.getmtime(path) > CACHE_TTL:
-        os.remove(path)
-        return None
-    try:
-        with open(path) as f:
-            return json.load(f)
-    except Exception:
-        return None
+    return _get_cache().get(_ckey(lat, lng, zoom, kw))
 
 
 def cache_set(lat, lng, zoom, kw, places):
-    path = os.path.join(CACHE_DIR, _ckey(lat, lng, zoom, kw) + '.json')
-    try:
-        with open(path, 'w') as f:
-            json.dump(places, f, ensure_ascii=False)
-    except Exception:
-        pass
+    _get_cache().set(_ckey(lat, lng, zoom, kw), places)
 
 
-# ── HTML PARSER ────────────────────────────────────────────────────
-def parse_html(html: str) -> list:
-    places = []
-    seen = set()
+def cache_keys(tasks, kw) -> list:
+    return [_ckey(t['lat'], t['lng'], t['zoom'], kw) for t in tasks]
 
-    place_ids = list(dict.fromkeys(
-        re.findall(r'ChIJ[a-zA-Z0-9_\-]{10,40}', html)
-    ))
 
-    for pid in place_ids[:120]:
-        if pid in seen:
-            continue
-        seen.add(pid)
+# ── PARSE POOL ─────────────────────────────────────────────────────
+# Parsing multi-MB pages is CPU-bound; doing it inline stalls every
+# other in-flight request on the loop. One pool per process, shared by
+# all keyword threads.
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
 
-        idx = html.find(pid)
-        if idx == -1:
-            continue
 
-        before = html[max(0, idx - 600):idx]
-        after  = html[idx:idx + 800]
-        ctx    = before + after
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            workers = get_optimal_concurrency()['parse']
+            # spawn, not fork — we are called from threads
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            log.info('parse_pool.started', workers=workers)
+        return _parse_pool
+
+
+def _saturated(found: int) -> bool:
+    # Near the per-search cap: the area likely holds places the page cut off
+    return found >= SEARCH_RESULT_CAP * ZOOM_SATURATION
+
+
+def _should_deepen(found: int, deeper: dict) -> bool:
+    """
+    Whether a cell that returned `found` places should also be searched
+    at the next zoom, given that zoom's running yield stats.
+    """
+    if _saturated(found):
+        return True
+    if deeper['searches'] >= ZOOM_YIELD_WARMUP:
+        return deeper['new'] / deeper['searches'] >= ZOOM_MIN_YIELD
+    # Still learning what the deeper zoom adds: explore a few cells
+    return deeper['scheduled'] < ZOOM_YIELD_WARMUP
+
+
+def _fit_zoom(cell: dict) -> int:
+    """
+    Deepest zoom (up to QUADTREE_MAX_ZOOM) at which a SPATIAL_VIEWPORT
+    map centred on `cell` shows the whole cell.
+    """
+    for zoom in range(QUADTREE_MAX_ZOOM, 0, -1):
+        view = viewport(cell['lat'], cell['lng'], zoom, *SPATIAL_VIEWPORT)
+        if (
+            contains(view, cell['lat'] - cell['half_lat'], cell['lng'] - cell['half_lng'])
+            and contains(view, cell['lat'] + cell['half_lat'], cell['lng'] + cell['half_lng'])
+        ):
+            return zoom
+    return 0
+
+
+def _split_cell(task: dict) -> list:
+    """
+    The four quadrant tasks of `task`, each at the zoom that fits it.
+    [] once the children would be smaller than the minimum cell size.
+    """
+    half_lat, half_lng = task['half_lat'] / 2, task['half_lng'] / 2
+    if (
+        min(half_lat, half_lng) * 2 < QUADTREE_MIN_CELL_DEG
+        or task['zoom'] >= QUADTREE_MAX_ZOOM
+    ):
+        return []
+    children = [
+        {**task,
+         'lat': task['lat'] + dy * half_lat,
+         'lng': task['lng'] + dx * half_lng,
+         'half_lat': half_lat, 'half_lng': half_lng,
+         'depth': task['depth'] + 1}
+        for dy in (-1, 1) for dx in (-1, 1)
+    ]
+    for child in children:
+        child['zoom'] = _fit_zoom(child)
+    return children
+
+
+def _zoom_summary(zoom_stats: dict) -> str:
+    return ' '.join(
+        f'z{z}:{s["searches"]}→+{s["new"]}'
+        for z, s in zoom_stats.items() if s['searches']
+    )
+
+
+def _report(sem, outcome: str, latency: float = None):
+    # Feed the AIMD controller; plain semaphores are left alone
+    record = getattr(sem, 'record', None)
+    if record is not None:
+        record(outcome, latency)
 
-        # Name
-        name = ''
-        nm = re.search(
-            r'"([A-Za-z0-9][^"]{3,80})"[^"]{0,200}' + re.escape(pid),
-            html[max(0, idx - 400):idx + 50]
-        )
-        if nm:
-            name = nm.group(1).strip()
-        if not name:
-            candidates = [
-                s for s in re.findall(r'"([A-Za-z][^"]{4,60})"', before[-300:])
-                if not s.startswith('http') and '\\' not in s
-            ]
-            if candidates:
-                name = candidates[-1]
-
-        if not name or len(name) < 3:
-            continue
-
-        phone_m  = re.search(r'(\+?[0-9][0-9\s\-\(\)]{8,18}[0-9])', ctx)
-        rating_m = re.search(r'"([1-5]\.[0-9])"', ctx)
-        review_m = re.search(r'"(\d{1,6})"(?=[^"]{0,30}"review)', ctx)
-        web_m    = re.search(
-            r'"(https?://(?!(?:www\.google|maps\.google|goo\.gl|googleapis|gstatic))[^"]{5,120})"',
-            ctx
-        )
 
-        places.append({
-            'place_id':     pid,
-            'name':         name,
-            'phone':        phone_m.group(1).strip() if phone_m else '',
-            'website':      web_m.group(1) if web_m else '',
-            'rating':       rating_m.group(1) if rating_m else '',
-            'review_count': review_m.group(1) if review_m else '',
-            'street': '', 'city': '', 'state': '',
-            'category': '', 'latitude': '', 'longitude': '',
-            'maps_url': (
-                f'https://www.google.com/maps/search/?api=1'
-                f'&query={quote(name)}&query_place_id={pid}'
-            ),
-        })
+def _remember_negative(cache, key: str, reason: str):
+    if NEGATIVE_CACHE and reason in NEGATIVE_TTLS:
+        cache.set(key, {'negative': reason}, NEGATIVE_TTLS[reason])
 
-    return places
+
+# ── STREAMING READER ───────────────────────────────────────────────
+_STATE_MARKER_B = APP_STATE_MARKER.encode()
+_SCRIPT_END_B   = b'</script>'
+
+
+async def _read_streaming(resp) -> tuple:
+    """
+    Read `resp` chunk by chunk.
+    Returns (body_bytes, 'blocked' | None). Closes the connection early
+    on a block page or once the place payload is complete.
+    """
+    buf = bytearray()
+    state_at = -1
+    scanned = 0
+
+    async for chunk in resp.content.iter_chunked(STREAM_CHUNK):
+        buf += chunk
+
+        if len(buf) - len(chunk) < BLOCK_SCAN_BYTES and is_blocked(buf):
+            resp.close()
+            return bytes(buf), 'blocked'
+
+        # Only rescan the new bytes (plus overlap for a split marker)
+        if state_at == -1:
+            state_at = buf.find(
+                _STATE_MARKER_B, max(0, scanned - len(_STATE_MARKER_B))
+            )
+            if state_at != -1:
+                scanned = state_at
+        if state_at != -1:
+            end = buf.find(
+                _SCRIPT_END_B, max(state_at, scanned - len(_SCRIPT_END_B))
+            )
+            if end != -1:
+                resp.close()
+                return bytes(buf[:end + len(_SCRIPT_END_B)]), None
+        scanned = len(buf)
+
+    return bytes(buf), None
 
 
 # ── HTTP SEARCH (one cell, one zoom) ──────────────────────────────
-async def http_one(session, lat, lng, zoom, keyword, sem) -> tuple:
+def _request_headers() -> dict:
+    return {
+        'User-Agent': random.choice(USER_AGENTS),
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Cookie': _cookie_str,
+    }
+
+
+async def _fetch(session, url: str, timeout: float) -> tuple:
+    """
+    One GET. Returns (body, early_outcome); the outcome is set instead
+    of a body for non-200 answers and block pages caught mid-stream.
+    """
+    async with session.get(
+        url,
+        headers=_request_headers(),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        allow_redirects=True,
+        ssl=False,
+    ) as resp:
+        if resp.status != 200:
+            return None, f'http_{resp.status}'
+        if HTTP_BYTES_MODE and HTTP_STREAM_MODE:
+            return await _read_streaming(resp)
+        if HTTP_BYTES_MODE:
+            return await resp.read(), None
+        return await resp.text(encoding='utf-8', errors='replace'), None
+
+
+async def _hedged_fetch(session, url: str, tracker, timing=None,
+                        sem=None) -> tuple:
+    """
+    _fetch() with the egress's adaptive timeout. Once the request has
+    run past the egress p95, a duplicate goes out on another pooled
+    connection; the first good answer wins and the other is cancelled.
+    The duplicate holds its own slot of `sem` (the caller holds one for
+    the primary) and is skipped when none is free, so hedges never push
+    past the AIMD limit.
+    """
+    timeout = tracker.timeout()
+    primary = asyncio.ensure_future(_fetch(session, url, timeout))
+    hedge = None
+    try_acquire = getattr(sem, 'try_acquire', None)
+    try:
+        delay = tracker.hedge_after() if HEDGE_REQUESTS else None
+        if delay is None or try_acquire is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        if not try_acquire():
+            return await primary
+
+        tracker.note_hedge()
+        hedge = asyncio.ensure_future(_fetch(session, url, timeout))
+        hedge.add_done_callback(lambda _: sem.release())
+        if timing is not None:
+            timing['hedges'] += 1
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for fut in done:
+                if fut.exception() is None:
+                    if fut is hedge and timing is not None:
+                        timing['hedge_wins'] += 1
+                    return fut.result()
+        return primary.result()
+    finally:
+        for fut in (primary, hedge):
+            if fut is not None and not fut.done():
+                fut.cancel()
+
+
+async def http_one(session, lat, lng, zoom, keyword, sem,
+                   timing=None, cache=None, egress=EGRESS_DIRECT) -> tuple:
     """
     Single HTTP request for one cell at one zoom level.
     Returns (places, method_string)
+
+    If `timing` is given, seconds spent on the network and on parsing
+    are added to timing['network'] / timing['parse'], and per-request
+    latency / hedging figures are collected for the job summary.
+    `cache` is the job's AsyncScrapeCache; cache I/O never blocks the loop.
     """
-    cached = cache_get(lat, lng, zoom, keyword)
+    if cache is None:
+        cache = AsyncScrapeCache(_get_cache())
+    key = _ckey(lat, lng, zoom, keyword)
+
+    cached = await cache.get(key)
+    if isinstance(cached, dict):
+        # Negative entry: e.g. 'cache_empty', 'cache_blocked'
+        return [], f"cache_{cached.get('negative')}"
     if cached is not None:
         return cached, 'cache'
+    if SPATIAL_CACHE:
+        bounds = viewport(lat, lng, zoom, *SPATIAL_VIEWPORT)
+        covered = await cache.lookup_viewport(keyword, zoom, bounds)
+        if covered is not None:
+            return covered, 'cache_spatial'
 
     url = (
         f'https://www.google.com/maps/search/'
         f'{quote(keyword)}'
         f'/@{lat},{lng},{zoom}z'
     )
+    tracker = get_latency_tracker(egress)
 
     async with sem:
         # Small random stagger — avoids burst fingerprint
         await asyncio.sleep(random.uniform(0.02, 0.15))
 
+        t_net = time.perf_counter()
         try:
-            async with session.get(
-                url,
-                headers={
-                    'User-Agent': random.choice(USER_AGENTS),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Cookie': _cookie_str,
-                },
-                timeout=aiohttp.ClientTimeout(total=15),
-                allow_redirects=True,
-                ssl=False,
-            ) as resp:
-
-                if resp.status != 200:
-                    return [], f'http_{resp.status}'
-
-                html = await resp.text(encoding='utf-8', errors='replace')
-
-                low = html.lower()
-                if any(x in low for x in [
-                    'unusual traffic', 'captcha',
-                    'before you continue', 'not a robot'
-                ]):
-                    return [], 'blocked'
-
-                if 'ChIJ' not in html:
-                    return [], 'no_data'
-
-                places = parse_html(html)
-                if places:
-                    cache_set(lat, lng, zoom, keyword, places)
-                    return places, 'http'
-                return [], 'parse_failed'
-
+            body, early = await _hedged_fetch(session, url, tracker, timing, sem)
         except asyncio.TimeoutError:
+            # Timeouts count at their full length so p95 can't shrink
+            # under a slowing upstream and spiral timeouts down
+            tracker.record(time.perf_counter() - t_net)
+            if timing is not None:
+                timing['timeouts'] += 1
+            _report(sem, 'timeout')
             return [], 'timeout'
         except Exception as e:
+            _report(sem, 'error')
             return [], f'err:{str(e)[:30]}'
 
+        net_sec = time.perf_counter() - t_net
+        tracker.record(net_sec)
+        if timing is not None:
+            timing['network'] += net_sec
+            timing['latencies'].append(net_sec)
+        if early:
+            _report(sem, early, net_sec)
+            _remember_negative(cache, key, early)
+            return [], early
+
+    # Parse outside the semaphore — the slot is for network, not CPU
+    t_parse = time.perf_counter()
+    try:
+        places, method = await asyncio.get_running_loop().run_in_executor(
+            _get_parse_pool(), parse_response, body
+        )
+    except Exception as e:
+        return [], f'err:{str(e)[:30]}'
+    finally:
+        if timing is not None:
+            timing['parse'] += time.perf_counter() - t_parse
+
+    _report(sem, method, net_sec)
+    if places:
+        cache.set(key, places)
+        if SPATIAL_CACHE:
+            cache.remember_viewport(keyword, zoom, bounds, places,
+                                    saturated=_saturated(len(places)))
+    else:
+        _remember_negative(cache, key, method)
+    return places, method
+
 
 # ── PLAYWRIGHT FALLBACK (one cell, one zoom) ──────────────────────
-async def playwright_one(browser, lat, lng, zoom, keyword, sem) -> list:
+async def playwright_one(browser, lat, lng, zoom, keyword, sem) -> tuple:
+    """
+    Browser search for one cell. Returns (places, outcome):
+    'browser' with places, 'empty' when the results feed rendered with
+    no cards, 'parse_failed' when it had cards but none could be read,
+    'no_feed' when the feed never showed and 'error' when the browser
+    itself failed.
+    """
     url = (
         f'https://www.google.com/maps/search/'
         f'{quote(keyword)}'
@@ -315,6 +606,7 @@ async def playwright_one(browser, lat, lng, zoom, keyword, sem) -> list:
 
         page = await ctx.new_page()
         places = []
+        outcome = 'browser'
 
         try:
             await page.goto(url, wait_until='domcontentloaded', timeout=25000)
@@ -331,7 +623,9 @@ async def playwright_one(browser, lat, lng, zoom, keyword, sem) -> list:
             try:
                 await page.wait_for_selector('div[role="feed"]', timeout=7000)
             except Exception:
-                return []
+                # Not a zero-result search: nothing was shown to count
+                log.info('playwright.no_feed', zoom=zoom)
+                return [], 'no_feed'
 
             no_change = 0
             last = 0
@@ -417,12 +711,16 @@ async def playwright_one(browser, lat, lng, zoom, keyword, sem) -> list:
                 except Exception:
                     continue
 
+            if not places:
+                outcome = 'parse_failed' if cards else 'empty'
+
         except Exception as e:
             log.error('playwright.error', error=str(e)[:60])
+            places, outcome = [], 'error'
         finally:
             await ctx.close()
 
-        return places
+        return places, outcome
 
 
 # ── DEDUP HELPER ───────────────────────────────────────────────────
@@ -434,14 +732,52 @@ def _dedup_key(p: dict) -> str:
     )
 
 
+class _LazyBrowser:
+    """
+    The runtime's shared Chromium, or one launched for this job — in
+    either case only once the first task actually needs it.
+    """
+
+    def __init__(self, runtime):
+        self.runtime = runtime
+        self._pw = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        if self.runtime is not None:
+            return await self.runtime.browser()
+        async with self._lock:
+            if self._browser is None:
+                self._pw = await async_playwright().start()
+                self._browser = await launch_browser(self._pw)
+                log.info('playwright.launched')
+            return self._browser
+
+    async def close(self):
+        # The runtime's browser outlives the job; only ours is closed
+        if self._browser is not None:
+            await self._browser.close()
+        if self._pw is not None:
+            await self._pw.stop()
+        self._browser = self._pw = None
+
+
 # ── MAIN PIPELINE ──────────────────────────────────────────────────
-async def run_keyword_pipeline(keyword_job_id: int):
+async def run_keyword_pipeline(keyword_job_id: int, runtime=None):
     """
     For each grid cell: fires ALL zoom levels simultaneously via HTTP.
     Every unique (cell, zoom) pair = one independent request.
     Failed pairs fall back to Playwright.
+
+    With a ScrapeRuntime the job shares its session, browser and
+    concurrency budget with every other job on that runtime.
+
+    Re-running an interrupted job resumes it: searches with a
+    CellCheckpoint are not repeated and the places it already saved
+    seed the dedup state.
     """
-    from jobs.models import KeywordJob, Place
+    from jobs.models import KeywordJob, Place, CellCheckpoint
     from django.utils import timezone
 
     kj = await KeywordJob.objects.select_related('bulk_job').aget(
@@ -451,6 +787,11 @@ async def run_keyword_pipeline(keyword_job_id: int):
     grid_size = kj.bulk_job.grid_size
     keyword   = kj.keyword
     t0        = time.time()
+    browser   = _LazyBrowser(runtime)
+    browser_serving = None
+    checkpoint = None
+    # New and enriched places go out as batched upserts
+    writer    = PlaceWriter(keyword_job_id)
 
     try:
         # ── Step 1: Cookies ───────────────────────────────────────
@@ -471,6 +812,10 @@ async def run_keyword_pipeline(keyword_job_id: int):
         # ── Step 3: Build ALL (cell × zoom) tasks ─────────────────
         kj.status = 'building_grid'
         
+        quadtree = GRID_MODE == 'quadtree'
+        if quadtree:
+            grid_size = max(2, math.ceil(grid_size / QUADTREE_ROOT_DIVISOR))
+
         cells = []
         if is_state:
             for point in search_points:
@@ -487,235 +832,459 @@ async def run_keyword_pipeline(keyword_job_id: int):
         else:
             cells = _build_grid(resolved['boundary'], grid_size)
             
-        zoom_levels = ZOOM_LEVELS
-
-        # Every cell × every zoom = one search task
-        all_tasks = [
-            {'cell_idx': idx, 'lat': c['lat'],
-             'lng': c['lng'], 'zoom': z}
-            for idx, c in enumerate(cells)
-            for z in zoom_levels
-        ]
+        # Quadtree roots run at one zoom wide enough to show each of
+        # them whole; children pick their own as they halve
+        if quadtree:
+            zoom_levels = [min(_fit_zoom(c) for c in cells)] if cells else ZOOM_LEVELS[:1]
+        else:
+            zoom_levels = ZOOM_LEVELS
+        adaptive = ZOOM_MODE == 'adaptive' and not quadtree
+
+        # Every cell × every zoom = one search task, generated on demand
+        # so only the queued few exist at any time
+        def iter_tasks(zooms):
+            for idx, c in enumerate(cells):
+                for z in zooms:
+                    yield {'cell_idx': idx, 'lat': c['lat'],
+                           'lng': c['lng'], 'zoom': z,
+                           'half_lat': c['half_lat'],
+                           'half_lng': c['half_lng'], 'depth': 0}
+
+        # Adaptive mode starts at the coarsest zoom; deeper ones are
+        # queued per cell as results come in
+        first_zooms = zoom_levels[:1] if adaptive else zoom_levels
+        total_tasks = len(cells) * len(zoom_levels)
+        first_count = len(cells) * len(first_zooms)
+        # Quadtree children get ids after the root cells
+        cell_ids = itertools.count(len(cells))
+        tree_depth = 0
 
         kj.total_cells  = len(cells)
-        kj.status_message = (
-            f'Grid: {grid_size}×{grid_size} = {len(cells)} cells × '
-            f'{len(zoom_levels)} zooms = {len(all_tasks)} total searches'
-        )
+        if quadtree:
+            kj.status_message = (
+                f'Quadtree: {grid_size}×{grid_size} = {len(cells)} root cells '
+                f'at z{zoom_levels[0]}, splitting saturated cells'
+            )
+        else:
+            kj.status_message = (
+                f'Grid: {grid_size}×{grid_size} = {len(cells)} cells × '
+                f'{len(zoom_levels)} zooms = '
+                f'{"up to " if adaptive else ""}{total_tasks} total searches'
+            )
         await kj.asave()
 
         log.info('pipeline.start',
                  keyword=keyword,
                  cells=len(cells),
                  zooms=zoom_levels,
-                 total_tasks=len(all_tasks))
+                 zoom_mode=ZOOM_MODE,
+                 grid_mode=GRID_MODE,
+                 total_tasks=total_tasks)
+
+        cache = AsyncScrapeCache(_get_cache())
+        prefetched = cache_keys(iter_tasks(zoom_levels), keyword)
+        hits = await cache.prefetch(prefetched)
+        log.info('cache.prefetched', keys=len(prefetched), hits=hits)
+
+        # ── Resume state ──────────────────────────────────────────
+        # unit key → results it returned, for searches finished before
+        # an interruption; their places are already stored
+        done_units = {
+            key: found async for key, found in
+            CellCheckpoint.objects.filter(keyword_job=kj)
+            .values_list('unit_key', 'found')
+        }
+        seen = {}    # place_id → place dict (best version)
+        async for p in Place.objects.filter(keyword_job=kj).values(
+            'place_id', 'name', *ENRICH_FIELDS
+        ):
+            seen[p['place_id'] or _dedup_key(p)] = p
+        if done_units or seen:
+            log.info('pipeline.resume',
+                     keyword=keyword,
+                     done_units=len(done_units),
+                     places=len(seen))
 
         # ── Step 4: ALL tasks fire simultaneously ─────────────────
         kj.status = 'searching'
         kj.status_message = (
-            f'⚡ Firing {len(all_tasks)} parallel searches...'
+            f'⚡ Queueing {first_count} searches...' if not done_units else
+            f'⚡ Resuming: {len(done_units)} searches already done, '
+            f'{len(seen)} places kept'
         )
         await kj.asave()
 
-        seen      = {}    # place_id → place dict (best version)
-        failed    = []    # (task, reason) pairs for Playwright
-        stats     = {'http': 0, 'cache': 0, 'blocked': 0,
-                     'no_data': 0, 'other': 0}
+        failed    = []    # tasks handed to the browser
+        stats     = {'http': 0, 'cache': 0, 'empty': 0, 'blocked': 0,
+                     'no_data': 0, 'other': 0, 'resumed': 0}
+
+        # Per-zoom searches run and first-seen places they added
+        zoom_stats = {
+            z: {'searches': 0, 'scheduled': 0, 'new': 0}
+            for z in zoom_levels
+        }
+        for z in first_zooms:
+            zoom_stats[z]['scheduled'] += len(cells)
 
         # Track which cells have been completed (for progress)
         cells_done_set = set()
 
-        http_sem = asyncio.Semaphore(HTTP_CONCURRENCY)
-        saved_count = 0
-
-        connector = aiohttp.TCPConnector(
-            limit=HTTP_CONCURRENCY + 10,
-            ttl_dns_cache=300,
-            use_dns_cache=True,
-            family=2,
+        pending_checkpoints = []
+        last_checkpoint = time.time()
+
+        async def checkpoint(task=None, found=0, force=False):
+            """Queue a finished search; write the batch when it is due."""
+            nonlocal pending_checkpoints, last_checkpoint
+            if task is not None:
+                pending_checkpoints.append(CellCheckpoint(
+                    keyword_job=kj, unit_key=_unit_key(task), found=found
+                ))
+            due = (
+                force or len(pending_checkpoints) >= CHECKPOINT_BATCH
+                or time.time() - last_checkpoint >= CHECKPOINT_EVERY_SEC
+            )
+            if not pending_checkpoints or not due:
+                return
+            batch, pending_checkpoints = pending_checkpoints, []
+            last_checkpoint = time.time()
+            # A search only counts as done once its places are stored
+            await writer.flush()
+            try:
+                await CellCheckpoint.objects.abulk_create(
+                    batch, ignore_conflicts=True
+                )
+            except Exception as e:
+                log.warning('checkpoint.flush_failed',
+                            rows=len(batch), error=str(e)[:80])
+
+        last_progress = 0.0
+
+        async def save_progress():
+            """Write the running counters once PROGRESS_EVERY_SEC has passed."""
+            nonlocal last_progress
+            if time.time() - last_progress < PROGRESS_EVERY_SEC:
+                return
+            last_progress = time.time()
+            kj.cells_done      = len(cells_done_set)
+            kj.total_extracted = saved_count
+            if http_running:
+                kj.status_message = (
+                    f'⚡ {len(cells_done_set)}/{kj.total_cells} cells | '
+                    f'{saved_count} found | '
+                    f'HTTP:{stats["http"]} Cache:{stats["cache"]} '
+                    f'Empty:{stats["empty"]} Blocked:{stats["blocked"]} | '
+                    f'Limit:{http_sem.describe()}'
+                )
+            else:
+                kj.status_message = f'🌐 Browser: {saved_count} total found'
+            await kj.asave(update_fields=PROGRESS_FIELDS)
+
+        # ── Browser fallback runs alongside HTTP ──────────────────
+        # Failed searches stream into a browser worker pool while the
+        # HTTP queue is still draining; Chromium starts on the first one
+        pw_sem = (
+            runtime.browser_sem if runtime is not None
+            else asyncio.Semaphore(PLAYWRIGHT_CONCURRENCY)
+        )
+        pw_count = 0
+        pw_started = None
+        http_running = True
+
+        def split(task, found: int) -> list:
+            """Quadtree children of a saturated cell, counted into the job."""
+            nonlocal tree_depth
+            children = _split_cell(task) if quadtree and _saturated(found) else []
+            for child in children:
+                child['cell_idx'] = next(cell_ids)
+                zoom_stats.setdefault(
+                    child['zoom'], {'searches': 0, 'scheduled': 0, 'new': 0}
+                )['scheduled'] += 1
+            if children:
+                kj.total_cells += len(children)
+                tree_depth = max(tree_depth, children[0]['depth'])
+            return children
+
+        def deepen(task, found: int):
+            """The next-zoom search for `task` in adaptive mode, or None."""
+            if not (adaptive and found):
+                return None
+            level = zoom_levels.index(task['zoom'])
+            if level + 1 >= len(zoom_levels):
+                return None
+            deeper = zoom_stats[zoom_levels[level + 1]]
+            if not _should_deepen(found, deeper):
+                return None
+            deeper['scheduled'] += 1
+            return {**task, 'zoom': zoom_levels[level + 1]}
+
+        async def run_playwright_task(task):
+            nonlocal saved_count, pw_count
+            places, outcome = await playwright_one(
+                await browser.get(),
+                task['lat'], task['lng'],
+                task['zoom'], keyword,
+                pw_sem
+            )
+            if outcome == 'error':
+                return
+            ckey = _ckey(task['lat'], task['lng'], task['zoom'], keyword)
+            if places:
+                cache.set(ckey, places)
+            else:
+                _remember_negative(cache, ckey, outcome)
+                if outcome == 'no_feed':
+                    # Unanswered, not searched: a resumed job retries it
+                    await save_progress()
+                    return
+            pw_count += len(places)
+
+            zs = zoom_stats.setdefault(
+                task['zoom'], {'searches': 0, 'scheduled': 0, 'new': 0}
+            )
+            for p in places:
+                key = p.get('place_id') or _dedup_key(p)
+                if not p['name'] or not key or key in seen:
+                    continue
+                seen[key] = p
+                zs['new'] += 1
+                saved_count += 1
+                await writer.put(key, p)
+
+            # Follow-ups of a search HTTP couldn't answer are scheduled
+            # the same way; they try HTTP while that phase runs
+            follow_ups = split(task, len(places))
+            deeper = deepen(task, len(places))
+            if deeper is not None:
+                follow_ups.append(deeper)
+            for follow_up in follow_ups:
+                if not (http_running and queue.push(follow_up, PRIORITY_FOLLOW_UP)):
+                    to_browser(follow_up)
+
+            await save_progress()
+            # A resume rebuilds the follow-ups from the stored count
+            await checkpoint(task, len(places))
+
+        browser_queue = WorkQueue(
+            run_playwright_task, workers=PLAYWRIGHT_CONCURRENCY
         )
+        browser_serving = asyncio.ensure_future(browser_queue.serve())
+
+        def to_browser(task):
+            nonlocal pw_started
+            failed.append(task)
+            if pw_started is None:
+                pw_started = time.time()
+            browser_queue.push(task)
+
+        if runtime is not None:
+            http_sem = runtime.http_sem
+            session_cm = contextlib.nullcontext(runtime.session())
+        else:
+            http_sem = make_http_limiter(HTTP_CONCURRENCY)
+            session_cm = new_http_session(http_sem.max_limit)
+        saved_count = len(seen)
+        timing = {'network': 0.0, 'parse': 0.0, 'latencies': [],
+                  'hedges': 0, 'hedge_wins': 0, 'timeouts': 0}
 
-        async with aiohttp.ClientSession(connector=connector) as session:
+        async with session_cm as session:
 
             async def run_task(task):
                 nonlocal saved_count
-                places, method = await http_one(
-                    session,
-                    task['lat'], task['lng'],
-                    task['zoom'], keyword,
-                    http_sem
-                )
+                found = done_units.get(_unit_key(task))
+                if found is not None:
+                    # Finished before the restart: only its follow-ups
+                    # are rebuilt, nothing is searched or saved again
+                    places, method = [], 'resumed'
+                else:
+                    places, method = await http_one(
+                        session,
+                        task['lat'], task['lng'],
+                        task['zoom'], keyword,
+                        http_sem, timing, cache
+                    )
+                    found = len(places)
 
                 # Track stats
-                if method == 'cache':
+                if method == 'resumed':
+                    stats['resumed'] += 1
+                elif method in ('cache', 'cache_spatial'):
                     stats['cache'] += 1
+                elif method == 'cache_empty':
+                    # Known empty — nothing for the browser to find
+                    stats['empty'] += 1
                 elif method == 'http':
                     stats['http'] += 1
-                elif method == 'blocked':
+                elif method in ('blocked', 'cache_blocked'):
                     stats['blocked'] += 1
-                    failed.append(task)
-                elif method == 'no_data':
+                    to_browser(task)
+                elif method in ('no_data', 'cache_no_data'):
                     stats['no_data'] += 1
-                    failed.append(task)
+                    to_browser(task)
                 else:
                     stats['other'] += 1
-                    failed.append(task)
+                    to_browser(task)
 
                 # Merge results — keep richest version of each place
+                zs = zoom_stats.setdefault(
+                    task['zoom'], {'searches': 0, 'scheduled': 0, 'new': 0}
+                )
+                if method != 'resumed':
+                    zs['searches'] += 1
                 for p in places:
                     key = p.get('place_id') or _dedup_key(p)
                     if not p['name'] or not key:
                         continue
                     if key not in seen:
                         seen[key] = p
-                        try:
-                            await Place.objects.acreate(
-                                keyword_job=kj, **p
-                            )
-                            saved_count += 1
-                        except Exception:
-                            pass
+                        zs['new'] += 1
+                        saved_count += 1
+                        await writer.put(key, p)
                     else:
                         # Update existing with richer data
                         existing = seen[key]
                         updated = False
-                        for field in ['phone', 'website', 'rating',
-                                      'review_count', 'street', 'category']:
+                        for field in ENRICH_FIELDS:
                             if p.get(field) and not existing.get(field):
                                 existing[field] = p[field]
                                 updated = True
                         if updated:
-                            try:
-                                await Place.objects.filter(
-                                    keyword_job=kj,
-                                    place_id=key
-                                ).aupdate(**{
-                                    f: existing[f]
-                                    for f in ['phone', 'website', 'rating',
-                                              'review_count', 'street', 'category']
-                                    if existing.get(f)
-                                })
-                            except Exception:
-                                pass
+                            await writer.put(key, existing)
 
                 # Mark cell done when all its zooms complete
                 cells_done_set.add(task['cell_idx'])
-                kj.cells_done    = len(cells_done_set)
-                kj.total_extracted = saved_count
-                kj.status_message  = (
-                    f'⚡ {len(cells_done_set)}/{len(cells)} cells | '
-                    f'{saved_count} found | '
-                    f'HTTP:{stats["http"]} Cache:{stats["cache"]} '
-                    f'Blocked:{stats["blocked"]}'
-                )
-                await kj.asave()
+                await save_progress()
 
                 log.info('task.done',
                          cell=task['cell_idx'],
                          zoom=task['zoom'],
                          method=method,
-                         found=len(places))
+                         found=found)
+
+                # Searches handed to the browser are checkpointed there
+                if method in ('http', 'cache', 'cache_spatial', 'cache_empty'):
+                    await checkpoint(task, found)
+
+                deeper = deepen(task, found)
+                if deeper is not None:
+                    queue.push(deeper)
 
-            # FIRE ALL TASKS AT ONCE
+                for child in split(task, found):
+                    queue.push(child, PRIORITY_FOLLOW_UP)
+
+            # Fixed worker pool; twice the HTTP ceiling so cache-served
+            # tasks keep flowing while the rest wait on the limiter
+            queue = WorkQueue(run_task, workers=http_sem.max_limit * 2)
             t_http = time.time()
-            await asyncio.gather(
-                *[run_task(t) for t in all_tasks],
-                return_exceptions=True
-            )
+            await queue.run(iter_tasks(first_zooms))
             http_time = round(time.time() - t_http, 1)
+            http_running = False
 
         log.info('http.phase.complete',
                  time_sec=http_time,
                  found=saved_count,
                  failed_tasks=len(failed),
-                 stats=stats)
-
-        # ── Step 5: Playwright for failed tasks ───────────────────
-        if failed:
-            kj.status_message = (
-                f'🌐 Browser fallback: {len(failed)} searches | '
-                f'{saved_count} found so far'
+                 stats=stats,
+                 zoom_stats=zoom_stats,
+                 queue_workers=queue.workers,
+                 queue_peak=queue.peak_queued,
+                 http_limit=http_sem.limit,
+                 http_limit_reason=http_sem.reason,
+                 cells=kj.total_cells,
+                 tree_depth=tree_depth,
+                 latency=summarize_latencies(timing['latencies']),
+                 latency_egress=get_latency_tracker(EGRESS_DIRECT).snapshot(),
+                 hedges=timing['hedges'],
+                 hedge_wins=timing['hedge_wins'],
+                 timeouts=timing['timeouts'],
+                 network_sec=round(timing['network'], 1),
+                 parse_sec=round(timing['parse'], 1))
+
+        # ── Step 5: Finish the browser fallback ───────────────────
+        browser_left = len(failed) - browser_queue.processed
+        if browser_left:
+            kj.cells_done      = len(cells_done_set)
+            kj.total_extracted = saved_count
+            kj.status_message  = (
+                f'🌐 Browser fallback: {browser_left} of {len(failed)} '
+                f'searches left | {saved_count} found so far'
             )
-            await kj.asave()
-
-            pw_sem = asyncio.Semaphore(PLAYWRIGHT_CONCURRENCY)
-            t_pw = time.time()
-            pw_count = 0
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--disable-gpu',
-                    ]
-                )
-
-                async def run_playwright_task(task):
-                    nonlocal saved_count, pw_count
-                    places = await playwright_one(
-                        browser,
-                        task['lat'], task['lng'],
-                        task['zoom'], keyword,
-                        pw_sem
-                    )
-                    pw_count += len(places)
-
-                    for p in places:
-                        key = p.get('place_id') or _dedup_key(p)
-                        if not p['name'] or not key or key in seen:
-                            continue
-                        seen[key] = p
-                        try:
-                            await Place.objects.acreate(keyword_job=kj, **p)
-                            saved_count += 1
-                        except Exception:
-                            pass
-
-                    kj.total_extracted = saved_count
-                    kj.status_message  = (
-                        f'🌐 Browser: {saved_count} total found'
-                    )
-                    await kj.asave()
-
-                await asyncio.gather(
-                    *[run_playwright_task(t) for t in failed],
-                    return_exceptions=True
-                )
-                await browser.close()
+            await kj.asave(update_fields=PROGRESS_FIELDS)
+        browser_queue.close()
+        await browser_serving
+        await browser.close()
+        await writer.close()
+        await checkpoint(force=True)
+        # saved_count moved when places were queued; rows the writer
+        # couldn't store (and enrichment re-writes) make that drift, so
+        # the final total is what the job actually holds
+        saved_count = await Place.objects.filter(keyword_job=kj).acount()
 
+        if failed:
             log.info('playwright.phase.complete',
-                     time_sec=round(time.time() - t_pw, 1),
+                     time_sec=round(time.time() - pw_started, 1),
+                     after_http_sec=round(time.time() - t_http - http_time, 1),
+                     searches=len(failed),
                      found=pw_count)
 
+        await cache.close(prefetched)
+        log.info('cache.memory', **_get_cache().memory.stats())
+
         # ── Done ──────────────────────────────────────────────────
         total_time = round(time.time() - t0, 1)
+        searched = sum(z['searches'] for z in zoom_stats.values())
         http_success_pct = round(
-            (stats['http'] + stats['cache'])
-            / max(len(all_tasks), 1) * 100
+            (stats['http'] + stats['cache'] + stats['empty'])
+            / max(searched, 1) * 100
+        )
+        latency = summarize_latencies(timing['latencies'])
+        hedge_win_pct = round(
+            timing['hedge_wins'] / max(timing['hedges'], 1) * 100
         )
 
         kj.status          = 'completed'
+        kj.cells_done      = len(cells_done_set)
         kj.total_extracted = saved_count
         kj.status_message  = (
             f'✓ {saved_count} places in {total_time}s | '
             f'HTTP success: {http_success_pct}% | '
-            f'{len(zoom_levels)} zoom levels searched'
+            f'{searched} searches ({_zoom_summary(zoom_stats)}) | '
+            f'{kj.total_cells} cells, tree depth {tree_depth} | '
+            f'latency p50 {latency["p50"]}s p95 {latency["p95"]}s '
+            f'p99 {latency["p99"]}s, hedged {timing["hedges"]} '
+            f'(won {hedge_win_pct}%) | '
+            f'net {timing["network"]:.1f}s / parse {timing["parse"]:.1f}s'
         )
         kj.completed_at = timezone.now()
         await kj.asave()
+        # Checkpoints only matter while a job can still be resumed
+        await CellCheckpoint.objects.filter(keyword_job=kj).adelete()
 
         log.info('pipeline.complete',
                  keyword=keyword,
                  total=saved_count,
                  time_sec=total_time,
+                 resumed=stats['resumed'],
                  http_pct=http_success_pct,
-                 zoom_levels=zoom_levels)
+                 zoom_levels=zoom_levels,
+                 searches=searched,
+                 zoom_stats=zoom_stats,
+                 tree_depth=tree_depth,
+                 latency=latency,
+                 hedges=timing['hedges'],
+                 hedge_wins=timing['hedge_wins'],
+                 hedge_win_pct=hedge_win_pct,
+                 timeouts=timing['timeouts'],
+                 network_sec=round(timing['network'], 1),
+                 parse_sec=round(timing['parse'], 1))
 
     except Exception as e:
+        if browser_serving is not None:
+            browser_serving.cancel()
+        await browser.close()
+        await writer.flush()
+        if checkpoint is not None:
+            # Keep what finished so a resume does not repeat it
+            await checkpoint(force=True)
         kj.status         = 'failed'
         kj.error_message  = str(e)
         kj.status_message = f'Failed: {str(e)}'
@@ -782,5 +1351,7 @@ def _build_grid(boundary: dict, grid_size: int) -> list:
                 'lat':  min_lat + (i + 0.5) * lat_step,
                 'lng':  min_lng + (j + 0.5) * lng_step,
                 'idx':  i * grid_size + j,
+                'half_lat': lat_step / 2,
+                'half_lng': lng_step / 2,
             })
     return cells
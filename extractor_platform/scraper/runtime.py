@@ -0,0 +1,124 @@
+# scraper/runtime.py
+# ─────────────────────────────────────────────────────────────────
+# One long-lived asyncio runtime per worker process.
+#
+# Every keyword job in the process runs as a coroutine on the same
+# event loop, sharing one HTTP connection pool, one Chromium and one
+# concurrency budget — so 20 keywords means 20 jobs draining the same
+# semaphore, not 20 × HTTP_CONCURRENCY uncoordinated requests.
+# ─────────────────────────────────────────────────────────────────
+import asyncio
+import threading
+import aiohttp
+import structlog
+from playwright.async_api import async_playwright
+
+from .concurrency import get_optimal_concurrency, make_http_limiter
+
+log = structlog.get_logger()
+
+# Keyword jobs allowed on the loop at once; the rest wait for a slot
+MAX_ACTIVE_JOBS = 20
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+]
+
+
+def new_http_session(limit: int) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=limit + 10,
+        ttl_dns_cache=300,
+        use_dns_cache=True,
+        family=2,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def launch_browser(pw):
+    return await pw.chromium.launch(headless=True, args=BROWSER_ARGS)
+
+
+class ScrapeRuntime:
+    """
+    Event loop on a daemon thread plus the resources jobs share on it.
+    Call submit() from any thread; the shared objects below are only
+    touched from the loop.
+    """
+
+    def __init__(self):
+        # One adaptive HTTP budget for every job on the runtime
+        self.http_sem = make_http_limiter()
+        self.http_limit = self.http_sem.max_limit
+        self.browser_limit = get_optimal_concurrency()['playwright']
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name='scrape-runtime', daemon=True
+        )
+        self._ready = threading.Event()
+        self._thread.start()
+        self._ready.wait()
+
+        self._session = None
+        self._pw = None
+        self._browser = None
+        self._browser_lock = None
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        # Loop-bound primitives are created on the loop's own thread
+        self.browser_sem = asyncio.Semaphore(self.browser_limit)
+        self.job_slots = asyncio.Semaphore(MAX_ACTIVE_JOBS)
+        self._ready.set()
+        self.loop.run_forever()
+
+    # ── scheduling ────────────────────────────────────────────────
+    def submit(self, coro_fn, *args):
+        """
+        Schedule coro_fn(*args, runtime=self) on the loop once a job slot
+        is free. Returns a concurrent.futures.Future.
+        """
+        async def guarded():
+            async with self.job_slots:
+                return await coro_fn(*args, runtime=self)
+        return asyncio.run_coroutine_threadsafe(guarded(), self.loop)
+
+    # ── shared resources (loop thread only) ───────────────────────
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = new_http_session(self.http_limit)
+        return self._session
+
+    async def browser(self):
+        """The shared Chromium, launched on first use and after a crash."""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                self._browser = await launch_browser(self._pw)
+                log.info('runtime.browser_launched')
+            return self._browser
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> ScrapeRuntime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = ScrapeRuntime()
+            log.info('runtime.started',
+                     http_start=_runtime.http_sem.limit,
+                     http_ceiling=_runtime.http_limit,
+                     browser_pages=_runtime.browser_limit,
+                     max_jobs=MAX_ACTIVE_JOBS)
+        return _runtime
@@ -0,0 +1,1332 @@
+# scraper/tests.py
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import types
+import zlib
+from unittest import mock
+from urllib.parse import quote
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from jobs.models import BulkJob, CellCheckpoint, KeywordJob, Place
+
+from . import pipeline
+from .cache_store import (
+    SCHEMA_VERSION, AsyncScrapeCache, MemoryLRU, ScrapeCacheStore, read_stats,
+)
+from .concurrency import AIMD_WINDOW, AIMDLimiter, LatencyTracker, summarize_latencies
+from .db_writer import PlaceWriter
+from .parser import decode_app_state, iter_places, parse_html, parse_response
+from .runtime import MAX_ACTIVE_JOBS, ScrapeRuntime
+from .tiles import viewport
+from .work_queue import PRIORITY_FOLLOW_UP, WorkQueue
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _legacy_parse_html(html: str) -> list:
+    """The per-id window parser scraper/parser.py replaced, kept as the reference."""
+    places = []
+    seen = set()
+    place_ids = list(dict.fromkeys(re.findall(r'ChIJ[a-zA-Z0-9_\-]{10,40}', html)))
+    for pid in place_ids[:120]:
+        if pid in seen:
+            continue
+        seen.add(pid)
+        idx = html.find(pid)
+        before = html[max(0, idx - 600):idx]
+        ctx = before + html[idx:idx + 800]
+        name = ''
+        nm = re.search(
+            r'"([A-Za-z0-9][^"]{3,80})"[^"]{0,200}' + re.escape(pid),
+            html[max(0, idx - 400):idx + 50]
+        )
+        if nm:
+            name = nm.group(1).strip()
+        if not name:
+            candidates = [
+                s for s in re.findall(r'"([A-Za-z][^"]{4,60})"', before[-300:])
+                if not s.startswith('http') and '\\' not in s
+            ]
+            if candidates:
+                name = candidates[-1]
+        if not name or len(name) < 3:
+            continue
+        phone_m = re.search(r'(\+?[0-9][0-9\s\-\(\)]{8,18}[0-9])', ctx)
+        rating_m = re.search(r'"([1-5]\.[0-9])"', ctx)
+        review_m = re.search(r'"(\d{1,6})"(?=[^"]{0,30}"review)', ctx)
+        web_m = re.search(
+            r'"(https?://(?!(?:www\.google|maps\.google|goo\.gl|googleapis|gstatic))[^"]{5,120})"',
+            ctx
+        )
+        places.append({
+            'place_id': pid,
+            'name': name,
+            'phone': phone_m.group(1).strip() if phone_m else '',
+            'website': web_m.group(1) if web_m else '',
+            'rating': rating_m.group(1) if rating_m else '',
+            'review_count': review_m.group(1) if review_m else '',
+            'street': '', 'city': '', 'state': '',
+            'category': '', 'latitude': '', 'longitude': '',
+            'maps_url': (
+                f'https://www.google.com/maps/search/?api=1'
+                f'&query={quote(name)}&query_place_id={pid}'
+            ),
+        })
+    return places
+
+
+# ── PARSER ─────────────────────────────────────────────────────────
+class ParserFixtureTests(SimpleTestCase):
+    """
+    maps_search_sample.html is a search page laid out the way the
+    decoder expects (APP_INITIALIZATION_STATE payload plus list markup);
+    replace it with a captured response when one is available.
+    """
+
+    def setUp(self):
+        self.html = _fixture('maps_search_sample.html')
+
+    def test_single_pass_matches_legacy_parser(self):
+        legacy = _legacy_parse_html(self.html)
+        self.assertTrue(legacy)
+        self.assertEqual(list(iter_places(self.html)), legacy)
+
+    def test_bytes_body_matches_text(self):
+        self.assertEqual(
+            list(iter_places(self.html.encode())), list(iter_places(self.html))
+        )
+        self.assertEqual(parse_html(self.html.encode()), parse_html(self.html))
+
+    def test_app_state_fields(self):
+        places = decode_app_state(self.html)
+        self.assertEqual(len(places), 3)
+        first = places[0]
+        self.assertEqual(first['place_id'], 'ChIJN1t_tDeuEmsRUsoyG83frY4')
+        self.assertEqual(first['name'], "Joe's Pizza Broadway")
+        self.assertEqual((first['latitude'], first['longitude']), (40.7546, -73.987))
+        self.assertEqual(first['category'], 'Pizza restaurant')
+        self.assertEqual((first['rating'], first['review_count']), ('4.5', '12873'))
+        self.assertEqual(first['phone'], '(212) 366-1182')
+        self.assertEqual(
+            (first['street'], first['city'], first['state']),
+            ('1435 Broadway', 'New York', 'NY'),
+        )
+        self.assertEqual(places[2]['website'], '')
+
+    def test_parse_response_merges_both_sources(self):
+        places, method = parse_response(self.html)
+        self.assertEqual(method, 'http')
+        self.assertEqual(len({p['place_id'] for p in places}), 5)
+
+    def test_block_page(self):
+        self.assertEqual(
+            parse_response('<html>Our systems have detected unusual traffic</html>'),
+            ([], 'blocked'),
+        )
+
+
+class _FakeContent:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for i in range(0, len(self.body), size):
+            yield self.body[i:i + size]
+
+
+class _FakeResponse:
+    def __init__(self, body: bytes, status: int = 200):
+        self.status = status
+        self.body = body
+        self.content = _FakeContent(body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self.body
+
+    async def text(self, encoding='utf-8', errors='strict'):
+        return self.body.decode(encoding, errors)
+
+    def close(self):
+        pass
+
+
+class _FakeSession:
+    """Answers every GET with the same canned body."""
+
+    def __init__(self, body: bytes, status: int = 200):
+        self.body = body
+        self.status = status
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return _FakeResponse(self.body, self.status)
+
+
+class _FakeLocator:
+    def __init__(self, n=0):
+        self.n = n
+        self.first = self
+
+    async def count(self):
+        return self.n
+
+    async def all(self):
+        return [self] * self.n
+
+    def locator(self, selector):
+        # Cards whose fields can't be read
+        return _FakeLocator()
+
+    async def all_text_contents(self):
+        return []
+
+
+class _FakePage:
+    """A Maps page whose results feed shows with `cards` cards, or never."""
+
+    def __init__(self, cards=None):
+        self.cards = cards
+
+    async def goto(self, url, **kwargs):
+        pass
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    async def wait_for_selector(self, selector, timeout):
+        if self.cards is None:
+            raise TimeoutError(selector)
+
+    async def evaluate(self, script):
+        pass
+
+    async def content(self):
+        return "You've reached the end of the list."
+
+    def locator(self, selector):
+        return _FakeLocator(self.cards if 'feed' in selector else 0)
+
+
+class _FakeBrowser:
+    def __init__(self, page):
+        self.page = page
+
+    async def new_context(self, **kwargs):
+        return self
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def add_init_script(self, script):
+        pass
+
+    async def new_page(self):
+        return self.page
+
+    async def close(self):
+        pass
+
+
+class _DelayedSession(_FakeSession):
+    """GETs answer after the next delay in `delays`, each with its own body."""
+
+    def __init__(self, delays, bodies):
+        super().__init__(b'')
+        self.delays = list(delays)
+        self.bodies = list(bodies)
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        delay, body = self.delays.pop(0), self.bodies.pop(0)
+
+        class _Slow(_FakeResponse):
+            async def __aenter__(self):
+                await asyncio.sleep(delay)
+                return self
+
+        return _Slow(body)
+
+
+def _temp_cache(test) -> ScrapeCacheStore:
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    return ScrapeCacheStore(os.path.join(tmp.name, 'cache.sqlite3'), ttl=3600)
+
+
+# ── HTTP SEARCH ────────────────────────────────────────────────────
+class HttpOneTests(SimpleTestCase):
+    """
+    Drives http_one end to end — fetch, parse pool, cache — against a
+    canned body, so a broken step fails here instead of degrading every
+    cell to an 'err:' outcome and the browser fallback.
+    """
+
+    def setUp(self):
+        self.store = _temp_cache(self)
+        patcher = mock.patch.object(pipeline, 'SPATIAL_CACHE', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _search(self, session, cache):
+        async def go():
+            places, method = await pipeline.http_one(
+                session, 40.7546, -73.987, 15, 'pizza',
+                asyncio.Semaphore(1), cache=cache,
+            )
+            await cache.close()
+            return places, method
+        return asyncio.run(go())
+
+    def test_fetch_and_parse(self):
+        session = _FakeSession(_fixture('maps_search_sample.html').encode())
+        places, method = self._search(session, AsyncScrapeCache(self.store))
+        self.assertEqual(method, 'http')
+        # Streaming hangs up once APP_INITIALIZATION_STATE has arrived,
+        # so only the decoded places come back, not the list cards
+        self.assertEqual(
+            [p['place_id'] for p in places],
+            [p['place_id'] for p in decode_app_state(_fixture('maps_search_sample.html'))],
+        )
+        self.assertEqual(len(session.urls), 1)
+
+    def test_second_search_is_served_from_cache(self):
+        body = _fixture('maps_search_sample.html').encode()
+        first, _ = self._search(_FakeSession(body), AsyncScrapeCache(self.store))
+
+        session = _FakeSession(b'')
+        places, method = self._search(session, AsyncScrapeCache(self.store))
+        self.assertEqual(method, 'cache')
+        self.assertEqual(places, first)
+        self.assertEqual(session.urls, [])
+
+    def test_http_error_status(self):
+        session = _FakeSession(b'', status=429)
+        places, method = self._search(session, AsyncScrapeCache(self.store))
+        self.assertEqual((places, method), ([], 'http_429'))
+
+
+# ── CACHE ──────────────────────────────────────────────────────────
+class CacheStoreTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        store = _temp_cache(self)
+        places = [{'place_id': 'ChIJabc', 'name': 'Café Ünïcode'}]
+        store.set('k', places)
+        store.flush()
+        self.assertEqual(store.get('k'), places)
+        self.assertIsNone(store.get('missing'))
+
+    def test_async_round_trip(self):
+        store = _temp_cache(self)
+
+        async def go():
+            cache = AsyncScrapeCache(store)
+            cache.set('k', [{'place_id': 'ChIJabc'}])
+            # Readers see queued writes before they reach the file
+            queued = await cache.get('k')
+            await cache.close()
+            return queued
+
+        self.assertEqual(asyncio.run(go()), [{'place_id': 'ChIJabc'}])
+        self.assertEqual(store.get('k'), [{'place_id': 'ChIJabc'}])
+
+    def test_expired_entries_are_not_returned(self):
+        store = _temp_cache(self)
+        store.set('k', [1], ttl=-1)
+        store.flush()
+        self.assertIsNone(store.get('k'))
+
+    def test_values_are_stored_compressed(self):
+        store = _temp_cache(self)
+        places = [{'place_id': f'ChIJ{i}', 'name': 'Café Ünïcode'} for i in range(50)]
+        store.set('k', places)
+        store.flush()
+
+        blob, size = store._conn.execute(
+            'SELECT value, size FROM entries WHERE key = ?', ('k',)
+        ).fetchone()
+        text = json.dumps(places, ensure_ascii=False)
+        self.assertEqual(zlib.decompress(blob).decode('utf-8'), text)
+        self.assertEqual(size, len(blob))
+        self.assertLess(size, len(text.encode('utf-8')))
+        # A fresh store reads the file, not the write buffer
+        self.assertEqual(ScrapeCacheStore(store.path, ttl=3600).get('k'), places)
+
+    def test_budget_evicts_least_recently_read(self):
+        store = _temp_cache(self)
+        for key in 'abc':
+            store.set(key, os.urandom(1500).hex())
+        store.flush()
+        for stamp, key in enumerate('abc', start=1):
+            store._conn.execute(
+                'UPDATE entries SET last_access = ? WHERE key = ?', (stamp, key)
+            )
+        store.get('a')   # read last, so b then c are the oldest
+        store.max_bytes = store._conn.execute(
+            'SELECT SUM(size) FROM entries').fetchone()[0]
+
+        store.set('d', os.urandom(1500).hex())
+        store.flush()
+
+        self.assertEqual(
+            sorted(k for k, in store._conn.execute('SELECT key FROM entries')),
+            ['a', 'd'],
+        )
+        stats = store.stats()
+        self.assertEqual(stats['evictions'], 2)
+        self.assertLessEqual(stats['bytes'], store.max_bytes)
+
+    def test_schema_bump_drops_old_entries(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'cache.sqlite3')
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            'CREATE TABLE entries (key TEXT PRIMARY KEY, value TEXT, expires_at REAL);'
+            'PRAGMA user_version = 1;'
+        )
+        conn.execute("INSERT INTO entries VALUES ('k', '[1]', ?)", (time.time() + 60,))
+        conn.commit()
+        conn.close()
+
+        # Older files read as empty until a store rebuilds them
+        self.assertEqual(read_stats(path)['entries'], 0)
+        store = ScrapeCacheStore(path, ttl=3600)
+        self.assertIsNone(store.get('k'))
+        self.assertEqual(
+            store._conn.execute('PRAGMA user_version').fetchone()[0],
+            SCHEMA_VERSION,
+        )
+        store.set('k', [2])
+        store.flush()
+        self.assertEqual(ScrapeCacheStore(path, ttl=3600).get('k'), [2])
+
+    def _populated(self):
+        store = _temp_cache(self)
+        store.set('live', [1])
+        store.set('stale', [2], ttl=-1)
+        store.get('live')
+        store.get('missing')
+        store.flush()
+        return store
+
+    def test_read_stats(self):
+        stats = read_stats(self._populated().path)
+        self.assertEqual((stats['entries'], stats['expired']), (2, 1))
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+        self.assertEqual(stats['ages'], {'<1h': 2, '1-3h': 0, '3-6h': 0, '6h+': 0})
+        self.assertGreater(stats['bytes'], 0)
+        self.assertGreater(stats['file_bytes'], 0)
+
+    def test_read_stats_without_a_file(self):
+        stats = read_stats(os.path.join(tempfile.gettempdir(), 'no-such-cache.sqlite3'))
+        self.assertEqual((stats['entries'], stats['hit_ratio']), (0, 0.0))
+
+    def test_cache_stats_command(self):
+        store = self._populated()
+        out = io.StringIO()
+        with mock.patch.multiple(
+            'jobs.management.commands.cache_stats',
+            CACHE_DB=store.path, CACHE_MAX_BYTES=1048576,
+        ):
+            call_command('cache_stats', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Entries:      2 (1 expired)', output)
+        self.assertIn('(budget 1 MB)', output)
+        self.assertIn('Hit ratio:    50.0% (1 hits / 1 misses, 0 evicted)', output)
+        self.assertIn('Ages:         <1h 2, 1-3h 0, 3-6h 0, 6h+ 0', output)
+
+
+class MemoryLRUTests(SimpleTestCase):
+
+    def test_budget_counts_encoded_bytes(self):
+        lru = MemoryLRU(max_bytes=1000, ttl=60)
+        text = '["Café Ünïcode"]'
+        lru.put('k', text)
+        self.assertEqual(lru.stats()['bytes'], len(text.encode()))
+        self.assertGreater(len(text.encode()), len(text))
+
+    def test_evicts_least_recently_used(self):
+        lru = MemoryLRU(max_bytes=30, ttl=60)
+        for key in 'abc':
+            lru.put(key, '"' + key * 8 + '"')   # 10 bytes each
+        lru.get('a')                            # b is now the oldest
+        lru.put('d', '"dddddddd"')
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 'a' * 8)
+        self.assertEqual(lru.get('d'), 'd' * 8)
+        self.assertEqual(lru.evictions, 1)
+        self.assertLessEqual(lru.stats()['bytes'], 30)
+
+    def test_multibyte_entry_over_budget_is_not_held(self):
+        lru = MemoryLRU(max_bytes=10, ttl=60)
+        lru.put('k', '"ééééé"')                 # 7 chars, 12 bytes
+        self.assertIsNone(lru.get('k'))
+        self.assertEqual(lru.stats()['bytes'], 0)
+
+    def test_expired_entry_is_a_miss(self):
+        lru = MemoryLRU(max_bytes=1000, ttl=60)
+        lru.put('old', '[1]', expires_at=time.time() - 1)
+        lru.put('new', '[2]')
+        self.assertIsNone(lru.get('old'))
+        self.assertEqual(lru.get('new'), [2])
+        self.assertEqual(lru.expired, 1)
+        self.assertEqual(lru.stats()['entries'], 1)
+
+    def test_hit_and_miss_counters(self):
+        lru = MemoryLRU(max_bytes=1000, ttl=60)
+        lru.put('k', '[1]')
+        lru.get('k')
+        lru.get('k')
+        lru.get('missing')
+        stats = lru.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+
+    def test_hits_hand_out_fresh_copies(self):
+        lru = MemoryLRU(max_bytes=1000, ttl=60)
+        lru.put('k', '[{"name": "a"}]')
+        lru.get('k')[0]['name'] = 'changed'
+        self.assertEqual(lru.get('k'), [{'name': 'a'}])
+
+
+class SpatialCoverageTests(SimpleTestCase):
+
+    def setUp(self):
+        self.store = _temp_cache(self)
+        self.bounds = viewport(40.7546, -73.987, 15, 1366, 768)
+        # A later search inside the first one's fully covered tiles
+        self.inner = viewport(40.7546, -73.987, 15, 600, 300)
+        self.places = [
+            {'place_id': f'ChIJspatial{i:02d}', 'name': f'Place {i}',
+             'latitude': 40.7546 + i * 1e-4, 'longitude': -73.987}
+            for i in range(3)
+        ]
+
+    def test_unsaturated_search_covers_viewport(self):
+        self.store.remember_viewport('Pizza', 15, self.bounds, self.places)
+        found = self.store.lookup_viewport('pizza', 15, self.inner)
+        self.assertEqual(
+            sorted(p['place_id'] for p in found),
+            [p['place_id'] for p in self.places],
+        )
+
+    def test_saturated_search_leaves_viewport_uncovered(self):
+        self.store.remember_viewport('pizza', 15, self.bounds, self.places,
+                                     saturated=True)
+        self.assertIsNone(self.store.lookup_viewport('pizza', 15, self.inner))
+
+    def test_missing_coordinates_leave_viewport_uncovered(self):
+        self.places[0]['latitude'] = ''
+        self.store.remember_viewport('pizza', 15, self.bounds, self.places)
+        self.assertIsNone(self.store.lookup_viewport('pizza', 15, self.inner))
+
+
+# ── NEGATIVE CACHE ─────────────────────────────────────────────────
+class NegativeCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.store = _temp_cache(self)
+        patcher = mock.patch.object(pipeline, 'SPATIAL_CACHE', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _ttl_left(self, key):
+        self.store.flush()
+        row = self.store._conn.execute(
+            'SELECT expires_at FROM entries WHERE key = ?', (key,)
+        ).fetchone()
+        return row[0] - time.time()
+
+    def _browser(self, cards):
+        async def go():
+            return await pipeline.playwright_one(
+                _FakeBrowser(_FakePage(cards)), 40.7, -73.9, 15, 'pizza',
+                asyncio.Semaphore(1),
+            )
+        return asyncio.run(go())
+
+    def test_block_page_is_remembered_briefly(self):
+        body = b'<html>Our systems have detected unusual traffic</html>'
+
+        async def go():
+            cache = AsyncScrapeCache(self.store)
+            first = await pipeline.http_one(
+                _FakeSession(body), 40.7, -73.9, 15, 'pizza',
+                asyncio.Semaphore(1), cache=cache,
+            )
+            session = _FakeSession(body)
+            second = await pipeline.http_one(
+                session, 40.7, -73.9, 15, 'pizza',
+                asyncio.Semaphore(1), cache=cache,
+            )
+            await cache.close()
+            return first, second, session.urls
+
+        first, second, urls = asyncio.run(go())
+        self.assertEqual(first, ([], 'blocked'))
+        self.assertEqual(second, ([], 'cache_blocked'))
+        self.assertEqual(urls, [])
+        ttl = self._ttl_left(pipeline._ckey(40.7, -73.9, 15, 'pizza'))
+        self.assertAlmostEqual(ttl, pipeline.NEGATIVE_TTLS['blocked'], delta=5)
+
+    def test_missing_feed_is_not_empty(self):
+        self.assertEqual(self._browser(cards=None), ([], 'no_feed'))
+        self.assertLess(
+            pipeline.NEGATIVE_TTLS['no_feed'], pipeline.NEGATIVE_TTLS['empty']
+        )
+
+    def test_rendered_feed_without_cards_is_empty(self):
+        self.assertEqual(self._browser(cards=0), ([], 'empty'))
+
+    def test_unreadable_cards_are_not_empty(self):
+        self.assertEqual(self._browser(cards=3), ([], 'parse_failed'))
+
+    def test_ttl_per_reason(self):
+        async def go():
+            cache = AsyncScrapeCache(self.store)
+            for reason in ('empty', 'no_feed', 'http_500'):
+                pipeline._remember_negative(cache, reason, reason)
+            await cache.close()
+
+        asyncio.run(go())
+        for reason in ('empty', 'no_feed'):
+            self.assertEqual(self.store.get(reason), {'negative': reason})
+            self.assertAlmostEqual(
+                self._ttl_left(reason), pipeline.NEGATIVE_TTLS[reason], delta=5
+            )
+        # Reasons without a TTL are not worth remembering
+        self.assertIsNone(self.store.get('http_500'))
+
+
+# ── WORK QUEUE ─────────────────────────────────────────────────────
+class WorkQueueTests(SimpleTestCase):
+
+    def test_push_after_drain_is_refused(self):
+        async def go():
+            done = []
+
+            async def handler(task):
+                done.append(task)
+
+            queue = WorkQueue(handler, workers=2)
+            await queue.run(['a', 'b'])
+            return done, queue.push('late')
+
+        done, accepted = asyncio.run(go())
+        self.assertEqual(sorted(done), ['a', 'b'])
+        self.assertFalse(accepted)
+
+    def test_push_while_running_is_served(self):
+        async def go():
+            done = []
+
+            async def handler(task):
+                await asyncio.sleep(0.01)
+                done.append(task)
+
+            queue = WorkQueue(handler, workers=1)
+            running = asyncio.ensure_future(queue.run(['a']))
+            await asyncio.sleep(0)
+            # e.g. the browser queue splitting a cell into the HTTP queue
+            accepted = queue.push('child', PRIORITY_FOLLOW_UP)
+            await running
+            return done, accepted
+
+        done, accepted = asyncio.run(go())
+        self.assertTrue(accepted)
+        self.assertEqual(sorted(done), ['a', 'child'])
+
+    def test_follow_ups_run_before_initial_tasks(self):
+        async def go():
+            order = []
+
+            async def handler(task):
+                order.append(task)
+                if task == 'root0':
+                    queue.push('child0')
+                    queue.push('child1')
+
+            queue = WorkQueue(handler, workers=1, maxsize=3)
+            await queue.run(f'root{i}' for i in range(4))
+            return order
+
+        order = asyncio.run(go())
+        self.assertEqual(order[0], 'root0')
+        # Pushed follow-ups jump the roots already fed, in FIFO order
+        self.assertEqual(order[1:3], ['child0', 'child1'])
+        self.assertEqual(order[3:], ['root1', 'root2', 'root3'])
+
+    def test_fifo_within_priority(self):
+        async def go():
+            order = []
+
+            async def handler(task):
+                order.append(task)
+
+            queue = WorkQueue(handler, workers=1)
+            await queue.run(range(10))
+            return order
+
+        self.assertEqual(asyncio.run(go()), list(range(10)))
+
+    def test_feeder_holds_only_maxsize_tasks(self):
+        async def go():
+            pulled = 0
+
+            def tasks():
+                nonlocal pulled
+                for i in range(100):
+                    pulled += 1
+                    yield i
+
+            seen_ahead = []
+
+            async def handler(task):
+                seen_ahead.append(pulled - task)
+                await asyncio.sleep(0)
+
+            queue = WorkQueue(handler, workers=2, maxsize=4)
+            await queue.run(tasks())
+            return max(seen_ahead), queue.processed
+
+        ahead, processed = asyncio.run(go())
+        self.assertEqual(processed, 100)
+        self.assertLessEqual(ahead, 4 + 2)
+
+    def test_failed_task_does_not_stop_the_queue(self):
+        async def go():
+            done = []
+
+            async def handler(task):
+                if task == 1:
+                    raise ValueError('boom')
+                done.append(task)
+
+            queue = WorkQueue(handler, workers=1)
+            await queue.run(range(3))
+            return done, queue.processed
+
+        self.assertEqual(asyncio.run(go()), ([0, 2], 3))
+
+
+# ── AIMD LIMITER ───────────────────────────────────────────────────
+class AIMDLimiterTests(SimpleTestCase):
+
+    def _window(self, limiter, outcome='http', latency=0.5, pressure=0):
+        for i in range(AIMD_WINDOW):
+            limiter.record('blocked' if i < pressure else outcome, latency)
+
+    def test_healthy_window_raises_limit(self):
+        limiter = AIMDLimiter(10, max_limit=20)
+        self._window(limiter)
+        self.assertEqual(limiter.limit, 11)
+        self.assertEqual(limiter.reason, 'healthy')
+
+    def test_pressure_cuts_limit(self):
+        limiter = AIMDLimiter(10, max_limit=20)
+        self._window(limiter, pressure=2)
+        self.assertEqual(limiter.limit, 5)
+        self.assertTrue(limiter.reason.startswith('backoff'))
+
+    def test_slow_window_holds_limit(self):
+        limiter = AIMDLimiter(10, max_limit=20)
+        self._window(limiter, latency=10.0)
+        self.assertEqual(limiter.limit, 10)
+
+    def test_limit_stays_within_bounds(self):
+        limiter = AIMDLimiter(3, min_limit=2, max_limit=4)
+        for _ in range(5):
+            self._window(limiter, pressure=AIMD_WINDOW)
+        self.assertEqual(limiter.limit, 2)
+        for _ in range(5):
+            self._window(limiter)
+        self.assertEqual((limiter.limit, limiter.reason), (4, 'at ceiling'))
+
+    def test_in_flight_never_exceeds_limit(self):
+        async def go():
+            limiter = AIMDLimiter(3, max_limit=3)
+            peak = 0
+
+            async def request():
+                nonlocal peak
+                async with limiter:
+                    peak = max(peak, limiter.in_flight)
+                    await asyncio.sleep(0.001)
+
+            await asyncio.gather(*(request() for _ in range(20)))
+            return peak, limiter.in_flight
+
+        self.assertEqual(asyncio.run(go()), (3, 0))
+
+    def test_raised_limit_wakes_waiters(self):
+        async def go():
+            limiter = AIMDLimiter(1, min_limit=1, max_limit=2)
+            await limiter.__aenter__()
+            waiter = asyncio.ensure_future(limiter.__aenter__())
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+            self._window(limiter)
+            await asyncio.sleep(0)
+            return waiter.done(), limiter.in_flight
+
+        self.assertEqual(asyncio.run(go()), (True, 2))
+
+    def test_cancelled_waiter_returns_no_slot(self):
+        async def go():
+            limiter = AIMDLimiter(1, min_limit=1, max_limit=1)
+            await limiter.__aenter__()
+            waiter = asyncio.ensure_future(limiter.__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            await limiter.__aexit__(None, None, None)
+            return limiter.in_flight
+
+        self.assertEqual(asyncio.run(go()), 0)
+
+
+# ── HEDGING ────────────────────────────────────────────────────────
+class HedgedFetchTests(SimpleTestCase):
+
+    def setUp(self):
+        for name, value in (('HEDGE_REQUESTS', True), ('HTTP_STREAM_MODE', False)):
+            patcher = mock.patch.object(pipeline, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.tracker = LatencyTracker('test')
+        for _ in range(40):
+            self.tracker.record(0.01)
+
+    def _fetch(self, limit, delays):
+        timing = {'hedges': 0, 'hedge_wins': 0}
+
+        async def go():
+            sem = AIMDLimiter(limit, min_limit=1, max_limit=limit)
+            session = _DelayedSession(delays, [b'primary', b'hedge'])
+            async with sem:
+                body = await pipeline._hedged_fetch(
+                    session, 'https://example.test/', self.tracker, timing, sem
+                )
+                # Let the losing request's cancellation settle
+                await asyncio.sleep(0.01)
+                held = sem.in_flight
+            return body, held, len(session.urls)
+
+        body, held, requests = asyncio.run(go())
+        return body, held, requests, timing
+
+    def test_hedge_wins_a_stalled_request_and_returns_its_slot(self):
+        body, held, requests, timing = self._fetch(2, [1.0, 0.0])
+        self.assertEqual(body, (b'hedge', None))
+        self.assertEqual(requests, 2)
+        self.assertEqual((timing['hedges'], timing['hedge_wins']), (1, 1))
+        # Only the caller's slot is still taken
+        self.assertEqual(held, 1)
+
+    def test_no_hedge_without_a_spare_slot(self):
+        body, held, requests, timing = self._fetch(1, [0.05, 0.0])
+        self.assertEqual(body, (b'primary', None))
+        self.assertEqual(requests, 1)
+        self.assertEqual(timing['hedges'], 0)
+        self.assertEqual(held, 1)
+
+    def test_latency_summary(self):
+        summary = summarize_latencies([i / 100 for i in range(1, 101)])
+        self.assertEqual(
+            summary, {'p50': 0.51, 'p95': 0.96, 'p99': 1.0, 'max': 1.0}
+        )
+
+
+# ── RUNTIME ────────────────────────────────────────────────────────
+class ScrapeRuntimeTests(SimpleTestCase):
+
+    def setUp(self):
+        self.runtime = ScrapeRuntime()
+        self.addCleanup(self.runtime.loop.call_soon_threadsafe, self.runtime.loop.stop)
+        self.started = []
+        self.release = threading.Event()
+
+    async def _job(self, n, runtime=None):
+        self.started.append(n)
+        while not self.release.is_set():
+            await asyncio.sleep(0.005)
+        return n * 2
+
+    def _wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_jobs_over_the_limit_wait_for_a_slot(self):
+        jobs = MAX_ACTIVE_JOBS + 3
+        futures = [self.runtime.submit(self._job, n) for n in range(jobs)]
+        self._wait_for(lambda: len(self.started) >= MAX_ACTIVE_JOBS)
+        time.sleep(0.05)
+        self.assertEqual(len(self.started), MAX_ACTIVE_JOBS)
+        self.assertFalse(any(f.done() for f in futures))
+
+        self.release.set()
+        self.assertEqual(
+            [f.result(timeout=5) for f in futures], [n * 2 for n in range(jobs)]
+        )
+        self.assertEqual(sorted(self.started), list(range(jobs)))
+
+    def test_job_error_comes_back_through_its_future(self):
+        async def broken(runtime=None):
+            raise ValueError('bad job')
+
+        failures = [self.runtime.submit(broken) for _ in range(MAX_ACTIVE_JOBS)]
+        for future in failures:
+            with self.assertRaisesMessage(ValueError, 'bad job'):
+                future.result(timeout=5)
+
+        # The loop is still serving and the failed jobs gave their slots back
+        self.assertTrue(self.runtime._thread.is_alive())
+        self.release.set()
+        self.assertEqual(self.runtime.submit(self._job, 21).result(timeout=5), 42)
+
+
+# ── CHECKPOINT / RESUME ────────────────────────────────────────────
+class _StubBrowser:
+    async def get(self):
+        return None
+
+    async def close(self):
+        pass
+
+
+class _PipelineTestCase(TransactionTestCase):
+    """
+    run_keyword_pipeline against the test database with the network
+    stubbed out: HTTP answers from _http_one, the browser from
+    _playwright_one (down unless a test overrides it).
+    """
+
+    BOUNDARY = {'min_lat': 30.20, 'max_lat': 30.26,
+                'min_lng': -97.80, 'max_lng': -97.74}
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = ScrapeCacheStore(
+            os.path.join(tmp.name, 'cache.sqlite3'), ttl=3600,
+            memory=MemoryLRU(1 << 20, 3600),
+        )
+
+        async def no_cookies():
+            pass
+
+        for name, value in (
+            ('ensure_cookies', no_cookies),
+            ('resolve_location_cached',
+             lambda location: {'type': 'city', 'boundary': self.BOUNDARY,
+                               'search_points': []}),
+            ('new_http_session', lambda limit: contextlib.nullcontext(None)),
+            ('_LazyBrowser', lambda runtime: _StubBrowser()),
+            ('playwright_one', self._playwright_one),
+            ('http_one', self._http_one),
+            ('_get_cache', lambda: store),
+            ('ZOOM_MODE', 'all'),
+            ('GRID_MODE', 'uniform'),
+        ):
+            patcher = mock.patch.object(pipeline, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.searched = []
+        self.browsed = []
+        self.blocked = set()
+        user = User.objects.create(username='resume')
+        bulk = BulkJob.objects.create(
+            user=user, location='Austin, TX', grid_size=3, status='running'
+        )
+        self.kj = KeywordJob.objects.create(bulk_job=bulk, keyword='tacos')
+
+    async def _http_one(self, session, lat, lng, zoom, keyword, sem, *args, **kwargs):
+        unit = (round(lat, 6), round(lng, 6), zoom)
+        self.searched.append(unit)
+        if unit[:2] in self.blocked:
+            return [], 'blocked'
+        # Two places per cell, seen again at every zoom
+        return [
+            {'place_id': f'ChIJ{lat:.4f}{lng:.4f}{i}', 'name': f'Taqueria {i}',
+             'street': '', 'latitude': lat, 'longitude': lng}
+            for i in range(2)
+        ], 'http'
+
+    async def _playwright_one(self, browser, lat, lng, zoom, keyword, sem):
+        self.browsed.append((round(lat, 6), round(lng, 6), zoom))
+        return [], 'error'
+
+    def _run(self):
+        asyncio.run(pipeline.run_keyword_pipeline(self.kj.id))
+        self.kj.refresh_from_db()
+
+
+class PipelineResumeTests(_PipelineTestCase):
+
+    def test_interrupted_job_resumes_without_repeating_searches(self):
+        cells = pipeline._build_grid(self.BOUNDARY, 3)
+        self.blocked = {(round(c['lat'], 6), round(c['lng'], 6)) for c in cells[:2]}
+        searches = len(cells) * len(pipeline.ZOOM_LEVELS)
+
+        # Die right after the HTTP phase, with two cells still waiting
+        # on the (failing) browser
+        with mock.patch.object(pipeline, 'summarize_latencies',
+                               side_effect=RuntimeError('worker killed')):
+            with self.assertRaises(RuntimeError):
+                self._run()
+        self.kj.refresh_from_db()
+        self.assertEqual(self.kj.status, 'failed')
+        self.assertEqual(len(self.searched), searches)
+        done = CellCheckpoint.objects.filter(keyword_job=self.kj).count()
+        self.assertEqual(done, searches - 2 * len(pipeline.ZOOM_LEVELS))
+        first_places = set(Place.objects.values_list('place_id', flat=True))
+        self.assertEqual(len(first_places), 2 * (len(cells) - 2))
+
+        self.searched, self.blocked = [], set()
+        KeywordJob.objects.filter(id=self.kj.id).update(status='pending')
+        self._run()
+
+        self.assertEqual(self.kj.status, 'completed')
+        # Only the searches without a checkpoint ran again
+        self.assertEqual(len(self.searched), 2 * len(pipeline.ZOOM_LEVELS))
+        places = set(Place.objects.values_list('place_id', flat=True))
+        self.assertTrue(first_places < places)
+        self.assertEqual(len(places), 2 * len(cells))
+        self.assertEqual(self.kj.total_extracted, len(places))
+        self.assertFalse(CellCheckpoint.objects.filter(keyword_job=self.kj).exists())
+
+
+class PipelineTotalsTests(_PipelineTestCase):
+
+    async def _http_one(self, session, lat, lng, zoom, keyword, sem, *args, **kwargs):
+        places, method = await super()._http_one(
+            session, lat, lng, zoom, keyword, sem, *args, **kwargs
+        )
+        # One place per cell the database refuses
+        places[0]['latitude'] = 'not a number'
+        return places, method
+
+    def test_rows_the_writer_rejects_are_not_counted(self):
+        self._run()
+        cells = len(pipeline._build_grid(self.BOUNDARY, 3))
+        self.assertEqual(self.kj.status, 'completed')
+        self.assertEqual(Place.objects.filter(keyword_job=self.kj).count(), cells)
+        self.assertEqual(self.kj.total_extracted, cells)
+        self.assertTrue(self.kj.status_message.startswith(f'✓ {cells} places'))
+        self.assertEqual(BulkJob.objects.get().extracted_total, cells)
+
+
+class ProgressThrottleTests(_PipelineTestCase):
+    """The pipeline's clock only moves when a test search says so."""
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        self.step = 0.0   # fake seconds each search takes
+        clock = types.SimpleNamespace(time=lambda: self.now, perf_counter=time.perf_counter)
+        self.saves = []
+        original = KeywordJob.asave
+
+        async def recording_asave(job, *args, **kwargs):
+            self.saves.append((kwargs.get('update_fields'), job.status,
+                               job.total_extracted, self.now))
+            return await original(job, *args, **kwargs)
+
+        for target, name, value in (
+            (pipeline, 'time', clock),
+            (KeywordJob, 'asave', recording_asave),
+        ):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _http_one(self, *args, **kwargs):
+        self.now += self.step
+        return await super()._http_one(*args, **kwargs)
+
+    def _progress_saves(self) -> list:
+        return [s for s in self.saves if s[0] == pipeline.PROGRESS_FIELDS]
+
+    def _assert_completed(self):
+        cells = len(pipeline._build_grid(self.BOUNDARY, 3))
+        self.assertEqual(self.kj.status, 'completed')
+        self.assertEqual(self.kj.cells_done, cells)
+        self.assertEqual(self.kj.total_extracted, 2 * cells)
+        self.assertIsNotNone(self.kj.completed_at)
+        self.assertEqual(self.saves[-1][1:3], ('completed', 2 * cells))
+
+    def test_frozen_clock_writes_progress_once(self):
+        self._run()
+        # 27 searches, all inside one throttle window
+        self.assertEqual(len(self._progress_saves()), 1)
+        # ...and the completed state is still written at that instant
+        self._assert_completed()
+
+    def test_progress_writes_are_spaced_by_the_throttle(self):
+        self.step = 0.25
+        self._run()
+        stamps = [s[3] for s in self._progress_saves()]
+        searches = len(self.searched)
+        self.assertGreater(len(stamps), 1)
+        self.assertLessEqual(
+            len(stamps), searches * self.step / pipeline.PROGRESS_EVERY_SEC + 1
+        )
+        for earlier, later in zip(stamps, stamps[1:]):
+            self.assertGreaterEqual(later - earlier, pipeline.PROGRESS_EVERY_SEC)
+        self._assert_completed()
+
+
+# ── ZOOM PLANNING ──────────────────────────────────────────────────
+def _zoom_stats(searches=0, scheduled=0, new=0) -> dict:
+    return {'searches': searches, 'scheduled': scheduled, 'new': new}
+
+
+class ShouldDeepenTests(SimpleTestCase):
+
+    def setUp(self):
+        self.saturated = int(pipeline.SEARCH_RESULT_CAP * pipeline.ZOOM_SATURATION)
+        self.warm = pipeline.ZOOM_YIELD_WARMUP
+
+    def test_saturated_search_always_goes_deeper(self):
+        barren = _zoom_stats(searches=50, scheduled=50, new=0)
+        self.assertTrue(pipeline._should_deepen(self.saturated, barren))
+        self.assertFalse(pipeline._should_deepen(self.saturated - 1, barren))
+
+    def test_explores_until_warmed_up(self):
+        self.assertTrue(pipeline._should_deepen(1, _zoom_stats(scheduled=self.warm - 1)))
+        self.assertFalse(pipeline._should_deepen(1, _zoom_stats(scheduled=self.warm)))
+
+    def test_follows_measured_yield(self):
+        paying = _zoom_stats(searches=self.warm, scheduled=self.warm,
+                             new=int(self.warm * pipeline.ZOOM_MIN_YIELD))
+        self.assertTrue(pipeline._should_deepen(1, paying))
+        paying['new'] -= 1
+        self.assertFalse(pipeline._should_deepen(1, paying))
+
+
+class AdaptiveZoomTests(_PipelineTestCase):
+    """HTTP is blocked everywhere, so every search lands on the browser."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(pipeline, 'ZOOM_MODE', 'adaptive')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cells = pipeline._build_grid(self.BOUNDARY, 3)
+        self.blocked = {(round(c['lat'], 6), round(c['lng'], 6)) for c in cells}
+        self.busy = (round(cells[0]['lat'], 6), round(cells[0]['lng'], 6))
+
+    async def _playwright_one(self, browser, lat, lng, zoom, keyword, sem):
+        unit = (round(lat, 6), round(lng, 6), zoom)
+        self.browsed.append(unit)
+        if unit[:2] != self.busy:
+            return [], 'empty'
+        # A full results page at every zoom
+        return [
+            {'place_id': f'ChIJz{zoom}n{i}', 'name': f'Taqueria {zoom}.{i}',
+             'street': '', 'latitude': lat, 'longitude': lng}
+            for i in range(pipeline.SEARCH_RESULT_CAP)
+        ], 'browser'
+
+    def test_saturated_browser_search_goes_deeper(self):
+        self._run()
+        self.assertEqual(self.kj.status, 'completed')
+        deeper = sorted(u[2] for u in self.browsed if u[:2] == self.busy)
+        self.assertEqual(deeper, pipeline.ZOOM_LEVELS)
+        # Cells that came back empty stay at the coarsest zoom
+        self.assertEqual(
+            {u[2] for u in self.browsed if u[:2] != self.busy},
+            {pipeline.ZOOM_LEVELS[0]},
+        )
+        self.assertEqual(
+            self.kj.total_extracted,
+            pipeline.SEARCH_RESULT_CAP * len(pipeline.ZOOM_LEVELS),
+        )
+
+
+def _shows(task: dict) -> bool:
+    """Whether the map searched for `task` shows all of its cell."""
+    view = viewport(task['lat'], task['lng'], task['zoom'], *pipeline.SPATIAL_VIEWPORT)
+    return (
+        view['min_lat'] <= task['lat'] - task['half_lat']
+        and view['max_lat'] >= task['lat'] + task['half_lat']
+        and view['min_lng'] <= task['lng'] - task['half_lng']
+        and view['max_lng'] >= task['lng'] + task['half_lng']
+    )
+
+
+class SplitCellTests(SimpleTestCase):
+
+    def setUp(self):
+        cell = pipeline._build_grid(
+            {'min_lat': 30.0, 'max_lat': 30.3, 'min_lng': -97.9, 'max_lng': -97.6}, 2
+        )[0]
+        self.root = {**cell, 'zoom': pipeline._fit_zoom(cell), 'depth': 0}
+
+    def test_fit_zoom_is_the_deepest_that_shows_the_cell(self):
+        self.assertTrue(_shows(self.root))
+        self.assertFalse(_shows({**self.root, 'zoom': self.root['zoom'] + 1}))
+        # A 0.15° cell needs a wider map than the default coarsest zoom
+        self.assertLess(self.root['zoom'], pipeline.ZOOM_LEVELS[0])
+
+    def test_children_tile_the_parent(self):
+        children = pipeline._split_cell(self.root)
+        self.assertEqual(len(children), 4)
+        r = self.root
+        for edge, pick in (('lat', min), ('lng', min)):
+            self.assertAlmostEqual(
+                pick(c[edge] - c[f'half_{edge}'] for c in children),
+                r[edge] - r[f'half_{edge}'],
+            )
+        for edge, pick in (('lat', max), ('lng', max)):
+            self.assertAlmostEqual(
+                pick(c[edge] + c[f'half_{edge}'] for c in children),
+                r[edge] + r[f'half_{edge}'],
+            )
+        for child in children:
+            self.assertAlmostEqual(child['half_lat'], r['half_lat'] / 2)
+            self.assertEqual(child['depth'], 1)
+            self.assertEqual(child['zoom'], r['zoom'] + 1)
+
+    def test_every_level_is_searched_whole(self):
+        level = [self.root]
+        while level:
+            for task in level:
+                self.assertTrue(_shows(task), task)
+            level = [c for task in level for c in pipeline._split_cell(task)][:16]
+
+    def test_stops_at_minimum_cell_and_maximum_zoom(self):
+        small = pipeline.QUADTREE_MIN_CELL_DEG / 2
+        self.assertEqual(
+            pipeline._split_cell({**self.root, 'half_lat': small, 'half_lng': small}), []
+        )
+        self.assertEqual(
+            pipeline._split_cell({**self.root, 'zoom': pipeline.QUADTREE_MAX_ZOOM}), []
+        )
+
+
+class QuadtreeExpansionTests(_PipelineTestCase):
+    """A 0.3° city as 2×2 roots; only the first root comes back saturated."""
+
+    BOUNDARY = {'min_lat': 30.0, 'max_lat': 30.3,
+                'min_lng': -97.9, 'max_lng': -97.6}
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(pipeline, 'GRID_MODE', 'quadtree')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.roots = pipeline._build_grid(self.BOUNDARY, 2)
+        self.busy = (round(self.roots[0]['lat'], 6), round(self.roots[0]['lng'], 6))
+
+    async def _http_one(self, session, lat, lng, zoom, keyword, sem, *args, **kwargs):
+        unit = (round(lat, 6), round(lng, 6), zoom)
+        self.searched.append(unit)
+        count = pipeline.SEARCH_RESULT_CAP if unit[:2] == self.busy else 2
+        return [
+            {'place_id': f'ChIJ{lat:.4f}{lng:.4f}{i}', 'name': f'Taqueria {i}',
+             'street': '', 'latitude': lat, 'longitude': lng}
+            for i in range(count)
+        ], 'http'
+
+    def test_saturated_root_is_split_and_searched_whole(self):
+        self._run()
+        self.assertEqual(self.kj.status, 'completed')
+
+        root_zoom = pipeline._fit_zoom(self.roots[0])
+        children = pipeline._split_cell({**self.roots[0], 'zoom': root_zoom, 'depth': 0})
+        expected = (
+            [(round(c['lat'], 6), round(c['lng'], 6), root_zoom) for c in self.roots]
+            + [(round(c['lat'], 6), round(c['lng'], 6), c['zoom']) for c in children]
+        )
+        self.assertEqual(sorted(self.searched), sorted(expected))
+        for cell in self.roots:
+            self.assertTrue(_shows({**cell, 'zoom': root_zoom}))
+        self.assertEqual(self.kj.total_cells, len(self.roots) + len(children))
+        self.assertEqual(
+            self.kj.total_extracted,
+            pipeline.SEARCH_RESULT_CAP + 2 * (len(self.roots) - 1 + len(children)),
+        )
+
+
+# ── DB WRITER ──────────────────────────────────────────────────────
+class PlaceWriterTests(TransactionTestCase):
+
+    def setUp(self):
+        user = User.objects.create(username='writer')
+        bulk = BulkJob.objects.create(user=user, location='Austin, TX')
+        self.kj = KeywordJob.objects.create(bulk_job=bulk, keyword='tacos')
+
+    def _place(self, n, **fields):
+        return {'place_id': f'ChIJwriter{n}', 'name': f'Taqueria {n}',
+                'latitude': 30.25, 'longitude': -97.75, **fields}
+
+    def _write(self, puts, batch_size=2):
+        writer = PlaceWriter(self.kj.id, batch_size=batch_size, flush_every=3600)
+
+        async def go():
+            for key, place in puts:
+                await writer.put(key, place)
+            await writer.close()
+
+        asyncio.run(go())
+        return writer
+
+    def test_batches_and_upserts(self):
+        writer = self._write(
+            [(f'k{n}', self._place(n)) for n in range(5)]
+            # Seen again with a phone number: updated in place
+            + [('k0', self._place(0, phone='512-555-0100', name='Renamed'))]
+        )
+        self.assertEqual(Place.objects.filter(keyword_job=self.kj).count(), 5)
+        self.assertEqual((writer.batches, writer.failed), (3, 0))
+        row = Place.objects.get(place_id='ChIJwriter0')
+        self.assertEqual(row.phone, '512-555-0100')
+        # Only enrichment fields are refreshed on conflict
+        self.assertEqual(row.name, 'Taqueria 0')
+
+    def test_missing_coordinates_and_id(self):
+        self._write([('dedup-key', self._place(0, place_id='', latitude='', longitude=''))])
+        row = Place.objects.get(keyword_job=self.kj)
+        self.assertEqual(row.place_id, 'dedup-key')
+        self.assertIsNone(row.latitude)
+        self.assertIsNone(row.longitude)
+
+    def test_bad_row_falls_back_to_per_row_writes(self):
+        writer = self._write(
+            [('k0', self._place(0)),
+             ('k1', self._place(1, latitude='not a number')),
+             ('k2', self._place(2))],
+            batch_size=3,
+        )
+        self.assertEqual(
+            sorted(Place.objects.values_list('place_id', flat=True)),
+            ['ChIJwriter0', 'ChIJwriter2'],
+        )
+        self.assertEqual((writer.written, writer.failed, writer.batches), (2, 1, 0))
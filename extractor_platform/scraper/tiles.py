@@ -0,0 +1,68 @@
+# scraper/tiles.py
+# Web-Mercator tile math for the spatial scrape cache.
+import math
+
+TILE_PX = 256
+
+
+def _lat_to_y(lat: float, zoom: int) -> float:
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    rad = math.radians(lat)
+    n = 2 ** zoom
+    return (1 - math.log(math.tan(rad) + 1 / math.cos(rad)) / math.pi) / 2 * n
+
+
+def _lng_to_x(lng: float, zoom: int) -> float:
+    return (lng + 180.0) / 360.0 * 2 ** zoom
+
+
+def _y_to_lat(y: float, zoom: int) -> float:
+    n = math.pi - 2 * math.pi * y / 2 ** zoom
+    return math.degrees(math.atan(math.sinh(n)))
+
+
+def _x_to_lng(x: float, zoom: int) -> float:
+    return x / 2 ** zoom * 360.0 - 180.0
+
+
+def tile_key(lat: float, lng: float, zoom: int) -> str:
+    return f'{zoom}/{int(_lng_to_x(lng, zoom))}/{int(_lat_to_y(lat, zoom))}'
+
+
+def viewport(lat: float, lng: float, zoom: int,
+             width_px: int, height_px: int) -> dict:
+    """Lat/lng bounds of a width×height map centred on (lat, lng)."""
+    half_w = width_px / TILE_PX / 2
+    half_h = height_px / TILE_PX / 2
+    x, y = _lng_to_x(lng, zoom), _lat_to_y(lat, zoom)
+    return {
+        'min_lat': _y_to_lat(y + half_h, zoom),
+        'max_lat': _y_to_lat(y - half_h, zoom),
+        'min_lng': _x_to_lng(x - half_w, zoom),
+        'max_lng': _x_to_lng(x + half_w, zoom),
+    }
+
+
+def tiles_in(bounds: dict, zoom: int, inner: bool = False) -> list:
+    """
+    Tile keys at `zoom` touching `bounds`. With inner=True only tiles
+    lying entirely inside the bounds.
+    """
+    x0 = _lng_to_x(bounds['min_lng'], zoom)
+    x1 = _lng_to_x(bounds['max_lng'], zoom)
+    y0 = _lat_to_y(bounds['max_lat'], zoom)
+    y1 = _lat_to_y(bounds['min_lat'], zoom)
+    if inner:
+        xs = range(math.ceil(x0), math.floor(x1))
+        ys = range(math.ceil(y0), math.floor(y1))
+    else:
+        xs = range(math.floor(x0), math.floor(x1) + 1)
+        ys = range(math.floor(y0), math.floor(y1) + 1)
+    return [f'{zoom}/{x}/{y}' for x in xs for y in ys]
+
+
+def contains(bounds: dict, lat: float, lng: float) -> bool:
+    return (
+        bounds['min_lat'] <= lat <= bounds['max_lat']
+        and bounds['min_lng'] <= lng <= bounds['max_lng']
+    )
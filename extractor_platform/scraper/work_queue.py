@@ -0,0 +1,103 @@
+# scraper/work_queue.py
+# ─────────────────────────────────────────────────────────────────
+# Bounded priority work queue drained by a fixed pool of workers.
+#
+# Tasks are pulled lazily from an iterable, so only about `maxsize`
+# of them exist at once however big the job is. Handlers may push()
+# follow-up work (deeper zooms, quadtree children) mid-run; lower
+# priority numbers run first. Once a queue has drained and stopped,
+# push() refuses new work so the caller can route it elsewhere.
+# ─────────────────────────────────────────────────────────────────
+import asyncio
+import itertools
+import structlog
+
+log = structlog.get_logger()
+
+PRIORITY_FOLLOW_UP = 0
+PRIORITY_INITIAL   = 1
+
+
+class WorkQueue:
+
+    def __init__(self, handler, workers: int, maxsize: int = None):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self._queue = asyncio.PriorityQueue()
+        # Bounds only what the feeder holds; follow-ups never block,
+        # or a worker pushing into a full queue could stall the pool
+        self._slots = asyncio.Semaphore(maxsize or self.workers * 2)
+        self._seq = itertools.count()
+        self.processed = 0
+        self.peak_queued = 0
+        self._pending = 0      # queued or running
+        self._stopped = False
+        self._closed = asyncio.Event()
+
+    def push(self, task, priority: int = PRIORITY_FOLLOW_UP) -> bool:
+        """
+        Insert a task now, ahead of anything with a larger priority.
+        False if the queue has already finished and nothing will run it.
+        """
+        if self._stopped:
+            return False
+        self._put(priority, False, task)
+        return True
+
+    def _put(self, priority, fed, task):
+        # seq keeps FIFO order within a priority and never compares tasks
+        self._pending += 1
+        self._queue.put_nowait((priority, next(self._seq), fed, task))
+        self.peak_queued = max(self.peak_queued, self._queue.qsize())
+
+    async def _drain(self):
+        # A push landing while join() wakes up starts another round;
+        # no await between the last check and _stopped, so none is lost
+        while self._pending:
+            await self._queue.join()
+        self._stopped = True
+
+    async def _feed(self, tasks, priority):
+        for task in tasks:
+            await self._slots.acquire()
+            self._put(priority, True, task)
+
+    async def _work(self):
+        while True:
+            _, _, fed, task = await self._queue.get()
+            if fed:
+                self._slots.release()
+            try:
+                await self.handler(task)
+            except Exception as e:
+                log.error('queue.task_failed', error=str(e)[:80])
+            finally:
+                self.processed += 1
+                self._pending -= 1
+                self._queue.task_done()
+
+    def close(self):
+        """Tell serve() no more tasks are coming."""
+        self._closed.set()
+
+    async def serve(self):
+        """Work on push()ed tasks until close() and the queue drains."""
+        pool = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        try:
+            await self._closed.wait()
+            await self._drain()
+        finally:
+            for w in pool:
+                w.cancel()
+            await asyncio.gather(*pool, return_exceptions=True)
+
+    async def run(self, tasks, priority: int = PRIORITY_INITIAL):
+        """Feed `tasks` and return once they and every follow-up are done."""
+        pool = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        try:
+            await self._feed(tasks, priority)
+            await self._drain()
+        finally:
+            for w in pool:
+                w.cancel()
+            await asyncio.gather(*pool, return_exceptions=True)